@@ -1,8 +1,38 @@
 import os
-from PySide6.QtWidgets import QWidget, QVBoxLayout
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+import heapq
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QMessageBox
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+from PySide6.QtGui import QPainter
+from PySide6.QtCharts import QChart, QChartView, QPieSeries
+
+# Threads sharing the directory walk; traversal is I/O-bound
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Minimum delay between chart redraws while a scan is in progress
+REPLOT_INTERVAL_MS = 200
+
+class ScanWorker(QObject):
+    """Computes directory sizes for the analyzer off the GUI thread"""
+    progress = Signal(str, int)
+    finished = Signal(list, list)
+    error = Signal(str)  # error message
+
+    def __init__(self, analyzer, directory):
+        super().__init__()
+        self.analyzer = analyzer
+        self.directory = directory
+
+    def run(self):
+        # Always end with finished or error so the thread is stopped
+        try:
+            sizes, labels = self.analyzer.scan_directory(self.directory, self.progress.emit)
+        except Exception as e:
+            self.error.emit(f"Failed to analyze {self.directory}: {str(e)}")
+        else:
+            self.finished.emit(sizes, labels)
 
 class DiskUsageAnalyzer(QWidget):
     """Widget for analyzing and visualizing directory sizes"""
@@ -10,52 +40,216 @@ class DiskUsageAnalyzer(QWidget):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
         
-        # Create Matplotlib Figure
-        self.figure = Figure(figsize=(8, 6))
-        self.canvas = FigureCanvas(self.figure)
-        self.layout.addWidget(self.canvas)
+        # Create pie chart
+        self.series = QPieSeries()
+        self.chart = QChart()
+        self.chart.addSeries(self.series)
+        self.chart.setTitle('Directory Size Distribution')
+        self.chart_view = QChartView(self.chart)
+        self.chart_view.setRenderHint(QPainter.Antialiasing)
+        self.layout.addWidget(self.chart_view)
+        
+        self.scan_worker = None
+        self.partial_sizes = {}
+        self.replot_pending = False
 
     def analyze_directory(self, directory):
-        """Analyze directory sizes and create pie chart visualization"""
-        # Collect folder sizes
-        sizes = []
-        labels = []
-        
-        for item in os.listdir(directory):
-            path = os.path.join(directory, item)
-            if os.path.isdir(path):
-                size = self.get_directory_size(path)
-                if size > 0:  # Only show non-empty folders
-                    sizes.append(size)
-                    labels.append(item)
-        
-        # Sort by size
-        sizes, labels = zip(*sorted(zip(sizes, labels), reverse=True))
-        
-        # Show only top 10
-        if len(sizes) > 10:
-            sizes = sizes[:10]
-            labels = labels[:10]
-        
-        # Create plot
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
+        """Analyze directory sizes in the background and plot the result"""
+        thread = QThread(self)
+        worker = ScanWorker(self, directory)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.progress.connect(self.update_progress)
+        worker.finished.connect(self.plot_sizes)
+        worker.finished.connect(thread.quit)
+        worker.error.connect(self.scan_failed)
+        worker.error.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
         
-        # Create pie chart
-        sizes_mb = [size / (1024 * 1024) for size in sizes]  # Convert to MB
-        ax.pie(sizes_mb, labels=labels, autopct='%1.1f%%')
-        ax.set_title('Directory Size Distribution')
+        # Only the most recently started scan gets plotted
+        self.scan_worker = worker
+        self.partial_sizes = {}
+        thread.start()
+
+    def scan_directory(self, directory, progress=None):
+        """Collect sizes of the largest subdirectories
+        
+        progress, if given, is called with the name and size of each
+        subdirectory as soon as it has been measured.
+        """
+        # Stay on the filesystem being analyzed, like du -x
+        root_dev = os.stat(directory).st_dev
+        
+        subdirs = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append((entry.name, entry.path))
+        
+        totals = self.measure_subdirectories(subdirs, root_dev, progress)
         
-        self.canvas.draw()
+        # Keep the 10 largest non-empty folders, sorted by size
+        top = heapq.nlargest(10, ((size, item) for item, size in totals.items() if size > 0))
+        sizes = [size for size, _ in top]
+        labels = [label for _, label in top]
+        
+        # Everything outside the top 10 is lumped into one slice
+        other_size = sum(totals.values()) - sum(sizes)
+        if other_size > 0:
+            sizes.append(other_size)
+            labels.append("Other")
+        return sizes, labels
 
-    def get_directory_size(self, directory):
-        """Calculate total size of a directory recursively"""
-        total_size = 0
-        for dirpath, dirnames, filenames in os.walk(directory):
-            for filename in filenames:
-                file_path = os.path.join(dirpath, filename)
+    def measure_subdirectories(self, subdirs, root_dev=None, progress=None):
+        """Measure several directory trees with one shared pool of walkers
+        
+        Every directory listing is a separate work item on a common queue, so
+        one huge subtree is spread across all workers instead of pinning a
+        single thread. Threads blocked in stat/getdents release the GIL,
+        which gives most of the syscall overlap of io_uring without a native
+        binding. Returns {name: size} for the given (name, path) pairs.
+        """
+        totals = {item: 0 for item, _ in subdirs}
+        if not subdirs:
+            return totals
+        
+        # Directories queued or being listed, per tree and overall
+        pending = {item: 1 for item, _ in subdirs}
+        outstanding = len(subdirs)
+        lock = threading.Lock()
+        work = queue.Queue()
+        for item, path in subdirs:
+            work.put((item, path))
+        
+        list_directory = self.list_directory
+        
+        def walk():
+            nonlocal outstanding
+            while True:
+                task = work.get()
+                if task is None:
+                    return
+                item, directory = task
+                files_size, children = 0, []
                 try:
-                    total_size += os.path.getsize(file_path)
-                except (OSError, FileNotFoundError):
-                    continue
+                    files_size, children = list_directory(directory, root_dev)
+                finally:
+                    # Count children before queueing them so a tree can't
+                    # look finished while its subdirectories are in flight
+                    with lock:
+                        totals[item] += files_size
+                        pending[item] += len(children) - 1
+                        outstanding += len(children) - 1
+                        tree_done = pending[item] == 0
+                        all_done = outstanding == 0
+                    for child in children:
+                        work.put((item, child))
+                    if tree_done and progress:
+                        progress(item, totals[item])
+                    if all_done:
+                        for _ in range(SCAN_WORKERS):
+                            work.put(None)
+        
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+            walkers = [executor.submit(walk) for _ in range(SCAN_WORKERS)]
+        for walker in walkers:
+            walker.result()
+        return totals
+
+    def update_progress(self, label, size):
+        """Record a measured subdirectory and schedule a chart redraw"""
+        if self.sender() is not self.scan_worker:
+            return
+        if size > 0:
+            self.partial_sizes[label] = size
+        
+        # Throttle redraws so fast scans don't flood the event loop
+        if not self.replot_pending:
+            self.replot_pending = True
+            QTimer.singleShot(REPLOT_INTERVAL_MS, self.replot_progress)
+
+    def replot_progress(self):
+        """Draw the subdirectories measured so far"""
+        self.replot_pending = False
+        if self.scan_worker is None:
+            return  # Final result is already drawn
+        top = heapq.nlargest(10, ((size, label) for label, size in self.partial_sizes.items()))
+        self.draw_pie([size for size, _ in top], [label for _, label in top])
+
+    def plot_sizes(self, sizes, labels):
+        """Create pie chart visualization of the final directory sizes"""
+        if self.sender() is not self.scan_worker:
+            return
+        self.scan_worker = None
+        self.draw_pie(sizes, labels)
+
+    def scan_failed(self, message):
+        """Report a scan that ended with an error"""
+        if self.sender() is not self.scan_worker:
+            return
+        self.scan_worker = None
+        QMessageBox.critical(self, "Error", message)
+
+    def draw_pie(self, sizes, labels):
+        """Replace the pie chart slices"""
+        self.series.clear()
+        for size, label in zip(sizes, labels):
+            self.series.append(label, size)  # Only the share is displayed
+        
+        # Label slices with their share once all of them are added
+        for pie_slice in self.series.slices():
+            pie_slice.setLabel(f"{pie_slice.label()} ({pie_slice.percentage():.1%})")
+            pie_slice.setLabelVisible(True)
+
+    def get_directory_size(self, directory, root_dev=None):
+        """Calculate total size of a directory recursively
+        
+        If root_dev is given, directories on other devices (mount points,
+        pseudo filesystems) are skipped.
+        """
+        total_size = 0
+        stack = [directory]
+        list_directory = self.list_directory
+        while stack:
+            files_size, children = list_directory(stack.pop(), root_dev)
+            total_size += files_size
+            stack.extend(children)
         return total_size
+
+    def list_directory(self, directory, root_dev=None):
+        """Return the size of the direct files and the subdirectories of a directory"""
+        if root_dev is not None:
+            try:
+                if os.stat(directory, follow_symlinks=False).st_dev != root_dev:
+                    return 0, []
+            except OSError:
+                return 0, []
+        
+        files_size = 0
+        children = []
+        add_child = children.append  # Bound once, called per entry
+        join = os.path.join
+        try:
+            # Listing through a descriptor makes DirEntry.stat use fstatat
+            # relative to it instead of resolving the full path per file
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return 0, []
+        try:
+            with os.scandir(dir_fd) as entries:
+                # File types come from readdir, so only the stat can fail
+                # per entry; anything else aborts this directory below
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        add_child(join(directory, entry.name))
+                    elif entry.is_file(follow_symlinks=False):
+                        try:
+                            files_size += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            continue
+        except OSError:
+            return 0, []
+        finally:
+            os.close(dir_fd)
+        return files_size, children
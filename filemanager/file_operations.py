@@ -0,0 +1,158 @@
+import os
+import shutil
+import fcntl
+import functools
+import threading
+import time
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+# ioctl request to share a file's extents with another file (Linux, btrfs/XFS)
+FICLONE = 0x40049409
+
+# Minimum seconds between progress signals, so huge trees don't flood the GUI
+PROGRESS_INTERVAL = 0.1
+
+def reflink_copy(src, dst, *, follow_symlinks=True):
+    """Copy a file by cloning its extents, falling back to a regular copy
+    
+    Usable as copy_function for shutil.copytree. On filesystems that
+    support reflinks the copy is a metadata-only operation.
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    # Checked before anything is opened for writing, which would empty src
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    if follow_symlinks or not os.path.islink(src):
+        try:
+            # Only clone into a new file; an existing dst is left to copy2
+            fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            with open(src, 'rb') as fsrc, open(fd, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            pass  # Exists, or not supported here or across filesystems
+        else:
+            shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+            return dst
+    return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+
+def reraise(error):
+    """onerror handler for scan_tree that aborts the walk"""
+    raise error
+
+def scan_tree(path, topdown=True, onerror=None):
+    """Yield (entry, is_dir) for everything below path
+    
+    Uses os.scandir, so each DirEntry carries the file type and a cached
+    stat from the directory listing. Symlinks are not followed. Like
+    os.walk, unreadable directories are skipped unless onerror is given.
+    With topdown=False a directory comes after its contents.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError as e:
+        if onerror is not None:
+            onerror(e)
+        return
+    for entry in entries:
+        is_dir = entry.is_dir(follow_symlinks=False)
+        if is_dir and topdown:
+            yield entry, True
+        if is_dir:
+            yield from scan_tree(entry.path, topdown, onerror)
+        if not (is_dir and topdown):
+            yield entry, is_dir
+
+def count_files(path):
+    """Count the non-directory entries below path, or 1 for a file"""
+    if not os.path.isdir(path) or os.path.islink(path):
+        return 1
+    return sum(1 for entry, is_dir in scan_tree(path) if not is_dir)
+
+def remove_path(path, step=None):
+    """Delete a file, symlink or directory tree
+    
+    Files and symlinks are unlinked without a prior stat; only when the
+    kernel reports a directory is the tree walked, bottom-up, reusing
+    each entry's type from the listing. step is called before each file
+    is removed.
+    """
+    try:
+        os.unlink(path)
+        return
+    except IsADirectoryError:
+        pass
+    for entry, is_dir in scan_tree(path, topdown=False, onerror=reraise):
+        if is_dir:
+            os.rmdir(entry.path)
+        else:
+            if step:
+                step()
+            os.unlink(entry.path)
+    os.rmdir(path)
+
+class OperationCancelled(Exception):
+    """Raised inside a FileOperationJob once it has been cancelled"""
+
+class FileOperationSignals(QObject):
+    """Signals reporting the outcome of a FileOperationJob"""
+    finished = Signal(str, str)  # target, success message
+    failed = Signal(str, str)  # target, error message
+    cancelled = Signal(str)  # target
+    progress = Signal(str, int, int)  # target, files processed, total (0 if unknown)
+
+class FileOperationJob(QRunnable):
+    """Runs a blocking file operation on a QThreadPool
+    
+    The signals object is created on the calling (GUI) thread, so
+    connected slots run there once the operation is done.
+    """
+    def __init__(self, target, description, message, operation, *args, **kwargs):
+        super().__init__()
+        self.target = target
+        self.description = description
+        self.message = message
+        self.operation = operation
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = FileOperationSignals()
+        self.stop = threading.Event()
+        self.processed = 0
+        self.last_progress = 0.0
+        self.count_path = None  # counted first so progress has a total
+        self.total = 0
+
+    def cancel(self):
+        """Stop the operation before its next step"""
+        self.stop.set()
+
+    def step(self):
+        """Count one processed item, raising OperationCancelled if cancelled"""
+        if self.stop.is_set():
+            raise OperationCancelled()
+        self.processed += 1
+        now = time.monotonic()
+        if now - self.last_progress >= PROGRESS_INTERVAL:
+            self.last_progress = now
+            self.signals.progress.emit(self.target, self.processed, self.total)
+
+    def tracked(self, function):
+        """Wrap a per-file function so each call is a cancellable step"""
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            self.step()
+            return function(*args, **kwargs)
+        return wrapper
+
+    def run(self):
+        try:
+            if self.count_path:
+                self.total = count_files(self.count_path)
+            self.operation(*self.args, **self.kwargs)
+        except OperationCancelled:
+            self.signals.cancelled.emit(self.target)
+        except Exception as e:
+            self.signals.failed.emit(self.target, f"Failed to {self.description}: {str(e)}")
+        else:
+            self.signals.finished.emit(self.target, self.message)
@@ -0,0 +1,94 @@
+import os
+import re
+import fnmatch
+from PySide6.QtCore import QObject, QRunnable, QDir, QDirIterator, QFileInfo, Signal
+
+# Characters that make a search term a shell-style wildcard pattern
+WILDCARD_CHARS = frozenset('*?[')
+
+# Matches are delivered to the UI in batches of this size
+RESULT_BATCH_SIZE = 100
+
+def compile_name_filter(term):
+    """Build a case-insensitive matcher for a file name search term
+    
+    Terms with wildcards must match the whole name, shell-style; other
+    terms match anywhere in the name.
+    """
+    if WILDCARD_CHARS.intersection(term):
+        return re.compile(fnmatch.translate(term), re.IGNORECASE).match
+    return re.compile(re.escape(term), re.IGNORECASE).search
+
+class SearchSignals(QObject):
+    """Signals reporting the progress of a SearchJob"""
+    results = Signal(list)  # batch of matching paths
+    finished = Signal()
+
+class SearchJob(QRunnable):
+    """Searches a directory tree by name, type, size and tag on a QThreadPool"""
+    def __init__(self, root, term, type_filter="All Files", min_size=None,
+                 max_size=None, tagged_paths=None):
+        super().__init__()
+        self.root = root
+        self.match_name = compile_name_filter(term)
+        self.type_filter = type_filter
+        self.min_size = min_size
+        self.max_size = max_size
+        self.tagged_paths = tagged_paths
+        self.cancelled = False
+        self.signals = SearchSignals()
+
+    def cancel(self):
+        """Stop the search at the next entry"""
+        self.cancelled = True
+
+    def run(self):
+        batch = []
+        for file_info in self.candidates():
+            if self.cancelled:
+                return
+            if self.matches(file_info):
+                batch.append(file_info.filePath())
+                if len(batch) >= RESULT_BATCH_SIZE:
+                    self.signals.results.emit(batch)
+                    batch = []
+        if batch:
+            self.signals.results.emit(batch)
+        self.signals.finished.emit()
+
+    def candidates(self):
+        """Yield QFileInfo objects for the entries to check"""
+        if self.tagged_paths is not None:
+            # Only tagged files can match, so skip walking the tree
+            prefix = os.path.join(self.root, '')
+            for path in sorted(self.tagged_paths):
+                if path.startswith(prefix):
+                    file_info = QFileInfo(path)
+                    if file_info.exists():
+                        yield file_info
+            return
+
+        # QDirIterator fills each QFileInfo from the directory listing
+        it = QDirIterator(self.root, QDir.AllEntries | QDir.Hidden | QDir.NoDotAndDotDot,
+                          QDirIterator.Subdirectories)
+        while it.hasNext():
+            it.next()
+            yield it.fileInfo()
+
+    def matches(self, file_info):
+        """Check an entry against the search filters"""
+        is_dir = file_info.isDir()
+        if self.type_filter == "Files Only" and is_dir:
+            return False
+        if self.type_filter == "Folders Only" and not is_dir:
+            return False
+        if self.min_size is not None or self.max_size is not None:
+            # Folders have no meaningful size of their own
+            if is_dir:
+                return False
+            size = file_info.size()
+            if self.min_size is not None and size < self.min_size:
+                return False
+            if self.max_size is not None and size > self.max_size:
+                return False
+        return self.match_name(file_info.fileName()) is not None
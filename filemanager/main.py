@@ -6,25 +6,131 @@ disk usage analysis, and advanced search capabilities.
 """
 import sys
 import os
+import stat
 import shutil
+import functools
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QTreeView, QListView, QLineEdit,
                              QPushButton, QFileSystemModel, QStyle, QToolBar,
                              QMenu, QMessageBox, QInputDialog, QDialog, QLabel,
                              QGridLayout, QSplitter, QComboBox, QCheckBox,
-                             QStatusBar, QHeaderView, QGroupBox, QSlider, QListWidget, QListWidgetItem)
+                             QStatusBar, QHeaderView, QGroupBox, QSlider, QListWidget, QListWidgetItem,
+                             QProgressDialog, QCompleter)
 from PySide6.QtCore import (Qt, QDir, QModelIndex, QFileInfo, QSize, QSettings, 
-                          QUrl, QMimeDatabase, QStandardPaths)
+                          QUrl, QMimeDatabase, QStandardPaths, QThreadPool, QTimer)
 from PySide6.QtGui import QAction, QIcon, QPalette, QColor, QKeySequence, QDesktopServices
 from PySide6.QtDBus import QDBusInterface
 import subprocess
 
 from tag_manager import TagManager
-from disk_usage_analyzer import DiskUsageAnalyzer
+from file_operations import reflink_copy, remove_path, FileOperationJob
+from file_search import SearchJob
+from preview_widget import PreviewWidget
+
+# Shared MIME database instead of constructing one per lookup
+MIME_DB = QMimeDatabase()
+
+# Executable name -> full path ('' if not found); PATH rarely changes
+# while the file manager is running
+EXECUTABLE_CACHE = {}
+
+# Applications offered in "Open With" per top-level MIME media type
+MIME_APPLICATIONS = {
+    'text': ['gedit', 'kate', 'mousepad', 'notepadqq'],
+    'image': ['eog', 'gwenview', 'gthumb', 'gimp'],
+}
+
+@functools.lru_cache(maxsize=1024)
+def mime_type_for_extension(extension):
+    """Look up a MIME type from a file extension alone"""
+    return MIME_DB.mimeTypeForFile(f"file{extension}", QMimeDatabase.MatchExtension)
+
+def mime_type_for_file(file_path):
+    """Get a file's MIME type, reading its contents only if it has no extension"""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension:
+        return mime_type_for_extension(extension)
+    return MIME_DB.mimeTypeForFile(file_path)
+
+@functools.lru_cache(maxsize=2)
+def theme_palette(theme):
+    """Build the palette for a theme once and reuse it"""
+    palette = QPalette()
+    if theme == "dark":
+        # Dark theme colors
+        palette.setColor(QPalette.Window, QColor(53, 53, 53))
+        palette.setColor(QPalette.WindowText, Qt.white)
+        palette.setColor(QPalette.Base, QColor(35, 35, 35))
+        palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
+        palette.setColor(QPalette.ToolTipBase, QColor(53, 53, 53))
+        palette.setColor(QPalette.ToolTipText, Qt.white)
+        palette.setColor(QPalette.Text, Qt.white)
+        palette.setColor(QPalette.Button, QColor(53, 53, 53))
+        palette.setColor(QPalette.ButtonText, Qt.white)
+        palette.setColor(QPalette.Link, QColor(42, 130, 218))
+        palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
+        palette.setColor(QPalette.HighlightedText, Qt.black)
+    else:
+        # Light theme (default Qt palette)
+        palette = QApplication.style().standardPalette()
+    return palette
+
+# Toolbar entries: name -> (standard icon, text, shortcut)
+TOOLBAR_ACTIONS = {
+    "back": (QStyle.StandardPixmap.SP_ArrowBack, "Back", QKeySequence.Back),
+    "forward": (QStyle.StandardPixmap.SP_ArrowForward, "Forward", QKeySequence.Forward),
+    "up": (QStyle.StandardPixmap.SP_ArrowUp, "Up", "Alt+Up"),
+    "home": (QStyle.StandardPixmap.SP_DirHomeIcon, "Home", "Ctrl+H"),
+    "search": (QStyle.StandardPixmap.SP_FileDialogContentsView, "Search", "Ctrl+F"),
+    "refresh": (QStyle.StandardPixmap.SP_BrowserReload, "Refresh", "F5"),
+    "settings": (QStyle.StandardPixmap.SP_FileDialogDetailedView, "Settings", "Ctrl+,")
+}
+
+@functools.lru_cache(maxsize=None)
+def standard_icon(pixmap):
+    """Icon from the application style, rendered once per pixmap id"""
+    return QApplication.style().standardIcon(pixmap)
+
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+def format_size(size):
+    """Convert file size to human-readable format"""
+    size = int(size)
+    # Each unit is 2**10 times the previous one
+    unit = 0 if size <= 0 else min((size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    return f"{size / (1 << (unit * 10)):.1f} {SIZE_UNITS[unit]}"
+
+@functools.lru_cache(maxsize=1)
+def path_index():
+    """Map names in PATH directories to their first full path, one readdir per directory"""
+    index = {}
+    for directory in os.environ.get('PATH', '').split(os.pathsep):
+        if not directory:
+            continue
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    index.setdefault(entry.name, entry.path)
+        except OSError:
+            continue
+    return index
+
+def find_executable(name):
+    """Find an executable on PATH, remembering the result"""
+    if name not in EXECUTABLE_CACHE:
+        if name and os.sep not in name:
+            path = path_index().get(name, '')
+            if path and not (os.path.isfile(path) and os.access(path, os.X_OK)):
+                # Shadowed by a non-executable; search the rest of PATH
+                path = QStandardPaths.findExecutable(name)
+        else:
+            path = QStandardPaths.findExecutable(name)
+        EXECUTABLE_CACHE[name] = path
+    return EXECUTABLE_CACHE[name]
 
 class SearchDialog(QDialog):
     """Advanced search dialog with filters for name, type, size, and tags"""
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, tags=()):
         super().__init__(parent)
         self.setWindowTitle("Advanced Search")
         self.setMinimumWidth(400)
@@ -54,6 +160,10 @@ class SearchDialog(QDialog):
         # Tag filter
         self.tag_input = QLineEdit()
         self.tag_input.setPlaceholderText("Filter by tag...")
+        # The tag list is sorted, so prefix completion is a binary search
+        completer = QCompleter(list(tags), self.tag_input)
+        completer.setModelSorting(QCompleter.CaseSensitivelySortedModel)
+        self.tag_input.setCompleter(completer)
         layout.addWidget(self.tag_input)
         
         # Action buttons
@@ -67,6 +177,42 @@ class SearchDialog(QDialog):
         self.ok_button.clicked.connect(self.accept)
         self.cancel_button.clicked.connect(self.reject)
 
+class SearchResultsDialog(QDialog):
+    """Lists search matches as they arrive from a background search"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.setWindowTitle("Search Results")
+        self.setMinimumWidth(500)
+        
+        layout = QVBoxLayout(self)
+        
+        self.status_label = QLabel("Searching...")
+        layout.addWidget(self.status_label)
+        
+        self.results_list = QListWidget()
+        self.results_list.itemDoubleClicked.connect(self.open_result)
+        layout.addWidget(self.results_list)
+        
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.reject)
+        layout.addWidget(close_button)
+
+    def add_results(self, paths):
+        """Append a batch of matching paths"""
+        self.results_list.addItems(paths)
+        self.status_label.setText(f"Searching... {self.results_list.count()} found")
+
+    def search_finished(self):
+        """Show the final number of matches"""
+        self.status_label.setText(f"{self.results_list.count()} found")
+
+    def open_result(self, item):
+        """Open a match in the file manager"""
+        index = self.parent.model.index(item.text())
+        if index.isValid():
+            self.parent.open_item(index)
+
 class PropertiesDialog(QDialog):
     """File properties dialog showing detailed information about files/folders"""
     def __init__(self, file_path, parent=None):
@@ -74,45 +220,48 @@ class PropertiesDialog(QDialog):
         self.setWindowTitle("Properties")
         self.setMinimumWidth(400)
         
+        # One stat for size, type and permissions; a broken link is shown
+        # as the link itself. Raises OSError if the path is gone.
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            st = os.lstat(file_path)
+        
         layout = QGridLayout(self)
-        file_info = QFileInfo(file_path)
         
         # Display file information
         layout.addWidget(QLabel("Name:"), 0, 0)
-        layout.addWidget(QLabel(file_info.fileName()), 0, 1)
+        layout.addWidget(QLabel(os.path.basename(file_path)), 0, 1)
         
         layout.addWidget(QLabel("Path:"), 1, 0)
-        layout.addWidget(QLabel(file_info.filePath()), 1, 1)
+        layout.addWidget(QLabel(file_path), 1, 1)
         
-        size = file_info.size()
-        size_str = self.format_size(size)
+        size_str = format_size(st.st_size)
         layout.addWidget(QLabel("Size:"), 2, 0)
         layout.addWidget(QLabel(size_str), 2, 1)
         
         layout.addWidget(QLabel("Type:"), 3, 0)
-        type_str = "Folder" if file_info.isDir() else "File"
+        type_str = "Folder" if stat.S_ISDIR(st.st_mode) else "File"
         layout.addWidget(QLabel(type_str), 3, 1)
         
-        # Show permissions
+        # Show permissions of the current user via the owner, group or other bits
         layout.addWidget(QLabel("Permissions:"), 4, 0)
+        if st.st_uid == os.getuid():
+            mode = st.st_mode >> 6
+        elif st.st_gid == os.getgid() or st.st_gid in os.getgroups():
+            mode = st.st_mode >> 3
+        else:
+            mode = st.st_mode
         perms = []
-        if file_info.isReadable(): perms.append("Read")
-        if file_info.isWritable(): perms.append("Write")
-        if file_info.isExecutable(): perms.append("Execute")
+        if mode & stat.S_IROTH: perms.append("Read")
+        if mode & stat.S_IWOTH: perms.append("Write")
+        if mode & stat.S_IXOTH: perms.append("Execute")
         layout.addWidget(QLabel(", ".join(perms)), 4, 1)
         
         ok_button = QPushButton("OK")
         ok_button.clicked.connect(self.accept)
         layout.addWidget(ok_button, 5, 0, 1, 2)
 
-    def format_size(self, size):
-        """Convert file size to human-readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} TB"
-
 class SettingsDialog(QDialog):
     """Settings dialog for customizing the file manager"""
     def __init__(self, parent=None):
@@ -196,9 +345,10 @@ class SettingsDialog(QDialog):
         self.parent.settings.setValue("icon_size", new_size)
         
         # Apply column visibility
-        for col, check in self.column_checks:
-            self.parent.tree_view.setColumnHidden(col, not check.isChecked())
-            self.parent.settings.setValue(f"show_column_{col}", check.isChecked())
+        visibility = {col: check.isChecked() for col, check in self.column_checks}
+        self.parent.set_columns_visible(visibility)
+        for col, show in visibility.items():
+            self.parent.settings.setValue(f"show_column_{col}", show)
         
         self.accept()
 
@@ -212,9 +362,12 @@ class OpenWithDialog(QDialog):
         
         layout = QVBoxLayout(self)
         
-        # Application list
+        # Icon shared by every application entry
+        self.app_icon = standard_icon(QStyle.StandardPixmap.SP_FileIcon)
+        
+        # Application list, filled once the dialog has been shown
         self.app_list = QListWidget()
-        self.populate_app_list()
+        QTimer.singleShot(0, self.populate_app_list)
         layout.addWidget(self.app_list)
         
         # Remember choice checkbox
@@ -239,40 +392,30 @@ class OpenWithDialog(QDialog):
 
     def populate_app_list(self):
         """Populate the list with common applications"""
-        # Get file type
-        mime_type = QMimeDatabase().mimeTypeForFile(self.file_path)
+        # Get file type, kept for saving a remembered choice
+        self.mime_type = mime_type_for_file(self.file_path)
+        mime_type = self.mime_type
         
         # Get default and alternative applications
         apps = []
         
         # Add system default if available
-        default_app = QStandardPaths.findExecutable(mime_type.defaultApplication())
+        default_app = find_executable(mime_type.defaultApplication())
         if default_app:
             self.app_list.addItem(QListWidgetItem(
-                self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon),
+                self.app_icon,
                 f"Default Application ({os.path.basename(default_app)})"
             ))
         
         # Add some common applications based on file type
-        if mime_type.name().startswith('text/'):
-            editors = ['gedit', 'kate', 'mousepad', 'notepadqq']
-            for editor in editors:
-                path = QStandardPaths.findExecutable(editor)
-                if path:
-                    self.app_list.addItem(QListWidgetItem(
-                        self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon),
-                        os.path.basename(path)
-                    ))
-        
-        elif mime_type.name().startswith('image/'):
-            viewers = ['eog', 'gwenview', 'gthumb', 'gimp']
-            for viewer in viewers:
-                path = QStandardPaths.findExecutable(viewer)
-                if path:
-                    self.app_list.addItem(QListWidgetItem(
-                        self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon),
-                        os.path.basename(path)
-                    ))
+        media_type = mime_type.name().split('/', 1)[0]
+        for app in MIME_APPLICATIONS.get(media_type, ()):
+            path = find_executable(app)
+            if path:
+                self.app_list.addItem(QListWidgetItem(
+                    self.app_icon,
+                    os.path.basename(path)
+                ))
 
     def browse_for_app(self):
         """Open file dialog to browse for an application"""
@@ -284,7 +427,7 @@ class OpenWithDialog(QDialog):
         )
         if file_path:
             self.app_list.addItem(QListWidgetItem(
-                self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon),
+                self.app_icon,
                 os.path.basename(file_path)
             ))
             self.app_list.setCurrentRow(self.app_list.count() - 1)
@@ -302,12 +445,43 @@ class FileManager(QMainWindow):
 
         # Initialize managers
         self.tag_manager = TagManager()
-        self.disk_analyzer = DiskUsageAnalyzer()
+        self._disk_analyzer = None
+        
+        # {directory: (mtime_ns, item count)} for the status bar
+        self.status_cache = {}
+        
+        # Background file operations in flight, keyed by target path
+        self.file_jobs = {}
+        self.file_progress = {}  # target path -> QProgressDialog
+        self.cut_sources = {}  # target path -> source of a move in flight
+        
+        # Background search started from the search dialog
+        self.search_job = None
+        
+        # Installed "Open With" applications, resolved once
+        self.app_table = self.resolve_app_table()
         
         self.setup_ui()
         self.apply_theme()
         self.load_settings()
 
+    def resolve_app_table(self):
+        """Map MIME media types to installed (name, path) applications"""
+        app_table = {}
+        for media_type, names in MIME_APPLICATIONS.items():
+            paths = [find_executable(name) for name in names]
+            app_table[media_type] = [(os.path.basename(path), path) for path in paths if path]
+        return app_table
+
+    @property
+    def disk_analyzer(self):
+        """Disk usage analyzer, created on first use"""
+        if self._disk_analyzer is None:
+            # Qt Charts is only loaded when needed
+            from disk_usage_analyzer import DiskUsageAnalyzer
+            self._disk_analyzer = DiskUsageAnalyzer()
+        return self._disk_analyzer
+
     def setup_ui(self):
         """Initialize the user interface"""
         central_widget = QWidget()
@@ -336,11 +510,19 @@ class FileManager(QMainWindow):
         self.list_view.setViewMode(QListView.IconMode)
         self.list_view.setIconSize(QSize(48, 48))
         self.list_view.setGridSize(QSize(120, 80))
+        # Lay out huge directories in chunks and skip per-item size hints
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QListView.Batched)
+        self.list_view.setBatchSize(500)
         self.list_view.setContextMenuPolicy(Qt.CustomContextMenu)
         self.list_view.customContextMenuRequested.connect(self.show_context_menu)
         self.list_view.doubleClicked.connect(self.handle_double_click)
         self.splitter.addWidget(self.list_view)
 
+        # Preview of the selected file
+        self.preview_widget = PreviewWidget()
+        self.splitter.addWidget(self.preview_widget)
+
         # Initialize file system model
         self.setup_model()
 
@@ -355,36 +537,31 @@ class FileManager(QMainWindow):
         # Initialize clipboard
         self.clipboard_source = None
         self.clipboard_action = None
+        self.clipboard_is_dir = False
 
         # Setup keyboard shortcuts
         self.setup_shortcuts()
 
+        # Build the right-click menus
+        self.setup_context_menus()
+
     def setup_toolbar(self, toolbar):
         """Setup navigation toolbar with actions"""
-        actions = {
-            "back": (QStyle.StandardPixmap.SP_ArrowBack, "Back", QKeySequence.Back),
-            "forward": (QStyle.StandardPixmap.SP_ArrowForward, "Forward", QKeySequence.Forward),
-            "up": (QStyle.StandardPixmap.SP_ArrowUp, "Up", QKeySequence("Alt+Up")),
-            "home": (QStyle.StandardPixmap.SP_DirHomeIcon, "Home", QKeySequence("Ctrl+H")),
-            "search": (QStyle.StandardPixmap.SP_FileDialogContentsView, "Search", QKeySequence("Ctrl+F")),
-            "refresh": (QStyle.StandardPixmap.SP_BrowserReload, "Refresh", QKeySequence("F5")),
-            "settings": (QStyle.StandardPixmap.SP_FileDialogDetailedView, "Settings", QKeySequence("Ctrl+,"))
+        handlers = {
+            "up": self.navigate_up,
+            "home": self.navigate_home,
+            "search": self.show_search_dialog,
+            "refresh": self.refresh_view,
+            "settings": self.show_settings
         }
 
-        for name, (icon, text, shortcut) in actions.items():
-            action = QAction(self.style().standardIcon(icon), text, self)
-            action.setShortcut(shortcut)
+        for name, (icon, text, shortcut) in TOOLBAR_ACTIONS.items():
+            action = QAction(standard_icon(icon), text, self)
+            action.setShortcut(QKeySequence(shortcut))
             toolbar.addAction(action)
-            if name == "up":
-                action.triggered.connect(self.navigate_up)
-            elif name == "home":
-                action.triggered.connect(self.navigate_home)
-            elif name == "search":
-                action.triggered.connect(self.show_search_dialog)
-            elif name == "refresh":
-                action.triggered.connect(self.refresh_view)
-            elif name == "settings":
-                action.triggered.connect(self.show_settings)
+            handler = handlers.get(name)
+            if handler:
+                action.triggered.connect(handler)
 
         # Add address bar
         self.address_bar = QLineEdit()
@@ -394,10 +571,17 @@ class FileManager(QMainWindow):
     def setup_model(self):
         """Initialize and configure the file system model"""
         self.model = QFileSystemModel()
+        # Skip reading per-folder .directory files for custom icons
+        self.model.setOption(QFileSystemModel.Option.DontUseCustomDirectoryIcons, True)
         self.model.setRootPath(QDir.rootPath())
         
         self.tree_view.setModel(self.model)
         self.list_view.setModel(self.model)
+        
+        # Clicks and arrow keys both move the current index; the preview
+        # widget debounces them
+        self.tree_view.selectionModel().currentChanged.connect(self.preview_current)
+        self.list_view.selectionModel().currentChanged.connect(self.preview_current)
 
         # Show all columns in tree view
         self.tree_view.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
@@ -405,6 +589,11 @@ class FileManager(QMainWindow):
             self.tree_view.header().setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
             self.tree_view.setColumnHidden(col, False)
 
+    def preview_current(self, current, previous):
+        """Preview the file a view's cursor moved to"""
+        if current.isValid() and not self.model.isDir(current):
+            self.preview_widget.request_preview(self.model.filePath(current))
+
     def setup_shortcuts(self):
         """Setup additional keyboard shortcuts"""
         shortcuts = {
@@ -425,26 +614,7 @@ class FileManager(QMainWindow):
 
     def apply_theme(self):
         """Apply the current theme to the application"""
-        palette = QPalette()
-        if self.current_theme == "dark":
-            # Dark theme colors
-            palette.setColor(QPalette.Window, QColor(53, 53, 53))
-            palette.setColor(QPalette.WindowText, Qt.white)
-            palette.setColor(QPalette.Base, QColor(35, 35, 35))
-            palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
-            palette.setColor(QPalette.ToolTipBase, QColor(53, 53, 53))
-            palette.setColor(QPalette.ToolTipText, Qt.white)
-            palette.setColor(QPalette.Text, Qt.white)
-            palette.setColor(QPalette.Button, QColor(53, 53, 53))
-            palette.setColor(QPalette.ButtonText, Qt.white)
-            palette.setColor(QPalette.Link, QColor(42, 130, 218))
-            palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
-            palette.setColor(QPalette.HighlightedText, Qt.black)
-        else:
-            # Light theme (default Qt palette)
-            palette = self.style().standardPalette()
-
-        QApplication.setPalette(palette)
+        QApplication.setPalette(theme_palette(self.current_theme))
 
     def load_settings(self):
         """Load saved settings"""
@@ -453,9 +623,18 @@ class FileManager(QMainWindow):
         self.list_view.setIconSize(QSize(icon_size, icon_size))
         
         # Load column visibility
-        for col in range(1, 4):
-            show = self.settings.value(f"show_column_{col}", True, type=bool)
-            self.tree_view.setColumnHidden(col, not show)
+        self.set_columns_visible({
+            col: self.settings.value(f"show_column_{col}", True, type=bool)
+            for col in range(1, 4)
+        })
+
+    def set_columns_visible(self, visibility):
+        """Show or hide tree view columns with a single repaint"""
+        self.tree_view.setUpdatesEnabled(False)
+        for col, show in visibility.items():
+            if self.tree_view.isColumnHidden(col) == show:
+                self.tree_view.setColumnHidden(col, not show)
+        self.tree_view.setUpdatesEnabled(True)
 
     def show_settings(self):
         """Show the settings dialog"""
@@ -464,9 +643,11 @@ class FileManager(QMainWindow):
 
     def refresh_view(self):
         """Refresh the current view"""
-        self.model.setRootPath("")  # This forces a refresh
-        self.model.setRootPath(QDir.rootPath())
+        # The model's own watcher keeps listings current; resetting the
+        # model would drop every directory listed so far. Only the cached
+        # status bar count is invalidated
         current_path = self.address_bar.text()
+        self.status_cache.pop(current_path, None)
         self.navigate_to_path()
         self.status_bar.showMessage("View refreshed", 2000)
 
@@ -474,19 +655,19 @@ class FileManager(QMainWindow):
         """Update status bar with current directory info"""
         dir_info = QFileInfo(path)
         if dir_info.isDir():
-            item_count = len(os.listdir(path))
+            # Reuse the entry count while the directory's mtime is unchanged
+            mtime = os.stat(path).st_mtime_ns
+            cached = self.status_cache.get(path)
+            if cached and cached[0] == mtime:
+                item_count = cached[1]
+            else:
+                with os.scandir(path) as entries:
+                    item_count = sum(1 for _ in entries)
+                self.status_cache[path] = (mtime, item_count)
             free_space = shutil.disk_usage(path).free
-            free_space_str = self.format_size(free_space)
+            free_space_str = format_size(free_space)
             self.status_bar.showMessage(f"Items: {item_count} | Free Space: {free_space_str}")
 
-    def format_size(self, size):
-        """Convert file size to human-readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} TB"
-
     def navigate_to_path(self):
         """Navigate to the path entered in the address bar"""
         path = self.address_bar.text()
@@ -498,123 +679,133 @@ class FileManager(QMainWindow):
         else:
             self.status_bar.showMessage("Invalid path", 2000)
 
+    def setup_context_menus(self):
+        """Build the context menus once; show_context_menu only updates them"""
+        # Context menu for files/folders
+        self.file_menu = QMenu(self)
+        
+        # Open actions
+        open_action = self.file_menu.addAction("Open")
+        self.open_with_menu = QMenu("Open With", self.file_menu)
+        self.file_menu.addMenu(self.open_with_menu)
+        
+        # Common applications per file type, shown for matching files
+        self.open_with_actions = {}
+        for media_type, apps in self.app_table.items():
+            actions = []
+            for name, path in apps:
+                action = self.open_with_menu.addAction(name)
+                action.triggered.connect(lambda _, app=path: self.open_with(self.context_path, app))
+                actions.append(action)
+            self.open_with_actions[media_type] = actions
+        
+        # Other applications...
+        self.open_with_menu.addSeparator()
+        choose_app_action = self.open_with_menu.addAction("Choose Application...")
+        choose_app_action.triggered.connect(lambda: self.show_open_with_dialog(self.context_path))
+        
+        self.file_menu.addSeparator()
+        
+        # File operations
+        copy_action = self.file_menu.addAction("Copy")
+        cut_action = self.file_menu.addAction("Cut")
+        self.file_paste_action = self.file_menu.addAction("Paste")
+        delete_action = self.file_menu.addAction("Delete")
+        rename_action = self.file_menu.addAction("Rename")
+        
+        self.file_menu.addSeparator()
+        properties_action = self.file_menu.addAction("Properties")
+        
+        # Connect actions
+        open_action.triggered.connect(lambda: self.open_item(self.context_index))
+        copy_action.triggered.connect(self.copy_selected)
+        cut_action.triggered.connect(self.cut_selected)
+        self.file_paste_action.triggered.connect(self.paste_files)
+        delete_action.triggered.connect(self.delete_selected)
+        rename_action.triggered.connect(lambda: self.rename_item(self.context_index))
+        properties_action.triggered.connect(lambda: self.show_properties_dialog(self.context_path))
+        
+        # Context menu for empty space
+        self.empty_menu = QMenu(self)
+        
+        # Create new items
+        new_menu = QMenu("New", self.empty_menu)
+        self.empty_menu.addMenu(new_menu)
+        
+        new_file_action = new_menu.addAction("File")
+        new_folder_action = new_menu.addAction("Folder")
+        
+        # Paste action, shown if clipboard has content
+        self.empty_paste_separator = self.empty_menu.addSeparator()
+        self.empty_paste_action = self.empty_menu.addAction("Paste")
+        self.empty_paste_action.triggered.connect(self.paste_files)
+        
+        # Connect create actions
+        new_file_action.triggered.connect(self.create_file)
+        new_folder_action.triggered.connect(self.create_folder)
+        
+        self.empty_menu.addSeparator()
+        refresh_action = self.empty_menu.addAction("Refresh")
+        refresh_action.triggered.connect(self.refresh_view)
+        
+        self.context_index = QModelIndex()
+        self.context_path = ""
+
     def show_context_menu(self, position):
         """Show context menu with file operations"""
         sender = self.sender()
         index = sender.indexAt(position)
-        menu = QMenu()
+        has_clipboard = bool(self.clipboard_source)
 
         if index.isValid():
-            # Context menu for files/folders
-            file_path = self.model.filePath(index)
+            self.context_index = index
+            self.context_path = self.model.filePath(index)
+            menu = self.file_menu
             
-            # Open actions
-            open_action = menu.addAction("Open")
-            open_with_menu = QMenu("Open With", menu)
-            menu.addMenu(open_with_menu)
-            
-            # Add some common applications based on file type
-            if os.path.isfile(file_path):  # Only show "Open With" for files
+            # Only show "Open With" for files, with apps matching the type
+            is_file = not self.model.isDir(index)  # Known from the listing, no stat
+            self.open_with_menu.menuAction().setVisible(is_file)
+            if is_file:
                 try:
-                    mime_type = QMimeDatabase().mimeTypeForFile(file_path)
-                    if mime_type.name().startswith('text/'):
-                        editors = ['gedit', 'kate', 'mousepad', 'notepadqq']
-                        for editor in editors:
-                            path = QStandardPaths.findExecutable(editor)
-                            if path:
-                                action = open_with_menu.addAction(os.path.basename(path))
-                                action.triggered.connect(lambda _, app=path: self.open_with(file_path, app))
-                    
-                    elif mime_type.name().startswith('image/'):
-                        viewers = ['eog', 'gwenview', 'gthumb', 'gimp']
-                        for viewer in viewers:
-                            path = QStandardPaths.findExecutable(viewer)
-                            if path:
-                                action = open_with_menu.addAction(os.path.basename(path))
-                                action.triggered.connect(lambda _, app=path: self.open_with(file_path, app))
-                    
-                    # Other applications...
-                    open_with_menu.addSeparator()
-                    choose_app_action = open_with_menu.addAction("Choose Application...")
-                    choose_app_action.triggered.connect(lambda: self.show_open_with_dialog(file_path))
+                    mime_name = mime_type_for_file(self.context_path).name()
                 except Exception as e:
+                    mime_name = ""
                     QMessageBox.critical(
                         self,
                         "Error",
                         f"Failed to get MIME type: {str(e)}"
                     )
+                media_type = mime_name.split('/', 1)[0]
+                for app_type, actions in self.open_with_actions.items():
+                    for action in actions:
+                        action.setVisible(app_type == media_type)
             
-            menu.addSeparator()
-            
-            # File operations
-            copy_action = menu.addAction("Copy")
-            cut_action = menu.addAction("Cut")
-            if self.clipboard_source:
-                paste_action = menu.addAction("Paste")
-            delete_action = menu.addAction("Delete")
-            rename_action = menu.addAction("Rename")
-            
-            menu.addSeparator()
-            properties_action = menu.addAction("Properties")
-            
-            # Connect actions
-            open_action.triggered.connect(lambda: self.open_item(index))
-            copy_action.triggered.connect(self.copy_selected)
-            cut_action.triggered.connect(self.cut_selected)
-            if self.clipboard_source:
-                paste_action.triggered.connect(self.paste_files)
-            delete_action.triggered.connect(self.delete_selected)
-            rename_action.triggered.connect(lambda: self.rename_item(index))
-            properties_action.triggered.connect(lambda: self.show_properties_dialog(file_path))
+            self.file_paste_action.setVisible(has_clipboard)
         
         else:
-            # Context menu for empty space
-            current_path = self.model.filePath(self.list_view.rootIndex())
-            
-            # Create new items
-            new_menu = QMenu("New", menu)
-            menu.addMenu(new_menu)
-            
-            new_file_action = new_menu.addAction("File")
-            new_folder_action = new_menu.addAction("Folder")
-            
-            # Paste action if clipboard has content
-            if self.clipboard_source:
-                menu.addSeparator()
-                paste_action = menu.addAction("Paste")
-                paste_action.triggered.connect(self.paste_files)
-            
-            # Connect create actions
-            new_file_action.triggered.connect(self.create_file)
-            new_folder_action.triggered.connect(self.create_folder)
-            
-            menu.addSeparator()
-            refresh_action = menu.addAction("Refresh")
-            refresh_action.triggered.connect(self.refresh_view)
+            menu = self.empty_menu
+            self.empty_paste_separator.setVisible(has_clipboard)
+            self.empty_paste_action.setVisible(has_clipboard)
         
         menu.exec(sender.mapToGlobal(position))
 
     def handle_double_click(self, index):
         """Handle double click on items"""
-        file_path = self.model.filePath(index)
-        if os.path.isdir(file_path):
-            # If it's a directory, navigate into it
-            self.list_view.setRootIndex(index)
-            self.tree_view.setCurrentIndex(index)
-            self.address_bar.setText(file_path)
-            self.update_status(file_path)
-        else:
-            # If it's a file, open it
-            self.open_item(index)
+        # Directories are entered and files opened
+        self.open_item(index)
+
+    def enter_directory(self, index, file_path):
+        """Show the given directory in both views"""
+        self.list_view.setRootIndex(index)
+        self.tree_view.setCurrentIndex(index)
+        self.address_bar.setText(file_path)
+        self.update_status(file_path)
 
     def open_item(self, index):
         """Open a file or directory"""
         file_path = self.model.filePath(index)
-        if os.path.isdir(file_path):
-            self.list_view.setRootIndex(index)
-            self.tree_view.setCurrentIndex(index)
-            self.address_bar.setText(file_path)
-            self.update_status(file_path)
+        if self.model.isDir(index):  # Known from the listing, no extra stat
+            self.enter_directory(index, file_path)
         else:
             # Try to open the file with default application
             url = QUrl.fromLocalFile(file_path)
@@ -642,13 +833,13 @@ class FileManager(QMainWindow):
                 QDesktopServices.openUrl(url)
             else:
                 # Use selected application
-                app_path = QStandardPaths.findExecutable(app_name)
+                app_path = find_executable(app_name)
                 if app_path:
                     self.open_with(file_path, app_path)
                     
                     # Save as default if requested
                     if dialog.remember_choice.isChecked():
-                        mime_type = QMimeDatabase().mimeTypeForFile(file_path)
+                        mime_type = dialog.mime_type
                         self.settings.setValue(f"default_app_{mime_type.name()}", app_path)
 
     def navigate_up(self):
@@ -672,11 +863,12 @@ class FileManager(QMainWindow):
         """Set clipboard content and action"""
         index = self.list_view.currentIndex()
         self.clipboard_source = self.model.filePath(index)
+        self.clipboard_is_dir = self.model.isDir(index)
         self.clipboard_action = action
 
     def show_search_dialog(self):
         """Show the search dialog and process results"""
-        dialog = SearchDialog(self)
+        dialog = SearchDialog(self, self.tag_manager.get_all_tags())
         if dialog.exec():
             search_term = dialog.search_input.text()
             file_type = dialog.type_combo.currentText()
@@ -684,19 +876,37 @@ class FileManager(QMainWindow):
             max_size = dialog.max_size.text()
             tag = dialog.tag_input.text()
             
-            # TODO: Implement search functionality
-            # For now, just show a message that search is not implemented
-            QMessageBox.information(
-                self,
-                "Search",
-                "Search functionality is coming soon!"
-            )
+            try:
+                min_bytes = float(min_size) * 1024 * 1024 if min_size else None
+                max_bytes = float(max_size) * 1024 * 1024 if max_size else None
+            except ValueError:
+                QMessageBox.warning(self, "Search", "Sizes must be numbers in MB")
+                return
+            
+            # Resolve the tag up front so the job only visits tagged paths
+            tagged_paths = set(self.tag_manager.get_files_by_tag(tag)) if tag else None
+            
+            if self.search_job:
+                self.search_job.cancel()
+            root = self.model.filePath(self.list_view.rootIndex())
+            job = SearchJob(root, search_term, file_type, min_bytes, max_bytes, tagged_paths)
+            
+            results_dialog = SearchResultsDialog(self)
+            results_dialog.setAttribute(Qt.WA_DeleteOnClose)
+            job.signals.results.connect(results_dialog.add_results)
+            job.signals.finished.connect(results_dialog.search_finished)
+            results_dialog.finished.connect(job.cancel)
+            results_dialog.show()
+            
+            self.search_job = job
+            QThreadPool.globalInstance().start(job)
 
     def copy_selected(self):
         """Copy the selected file or directory"""
         index = self.list_view.currentIndex()
         if index.isValid():
             self.clipboard_source = self.model.filePath(index)
+            self.clipboard_is_dir = self.model.isDir(index)
             self.clipboard_action = 'copy'
             self.status_bar.showMessage("Item copied to clipboard", 2000)
 
@@ -705,6 +915,7 @@ class FileManager(QMainWindow):
         index = self.list_view.currentIndex()
         if index.isValid():
             self.clipboard_source = self.model.filePath(index)
+            self.clipboard_is_dir = self.model.isDir(index)
             self.clipboard_action = 'cut'
             self.status_bar.showMessage("Item cut to clipboard", 2000)
 
@@ -717,25 +928,99 @@ class FileManager(QMainWindow):
         current_path = self.model.filePath(self.list_view.rootIndex())
         source_name = os.path.basename(self.clipboard_source)
         target_path = os.path.join(current_path, source_name)
+        if target_path in self.file_jobs:
+            self.status_bar.showMessage("Paste already in progress", 2000)
+            return
 
-        try:
-            if self.clipboard_action == 'copy':
-                if os.path.isdir(self.clipboard_source):
-                    shutil.copytree(self.clipboard_source, target_path)
-                else:
-                    shutil.copy2(self.clipboard_source, target_path)
-                self.status_bar.showMessage("Item copied successfully", 2000)
-            elif self.clipboard_action == 'cut':
-                shutil.move(self.clipboard_source, target_path)
-                self.clipboard_source = None
-                self.clipboard_action = None
-                self.status_bar.showMessage("Item moved successfully", 2000)
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Failed to paste: {str(e)}"
-            )
+        # Copy or move on the thread pool so large trees don't freeze the UI
+        if self.clipboard_action == 'copy':
+            if self.clipboard_is_dir:
+                job = FileOperationJob(target_path, "paste", "Item copied successfully",
+                                       shutil.copytree, self.clipboard_source, target_path)
+                job.kwargs['copy_function'] = job.tracked(reflink_copy)
+                job.count_path = self.clipboard_source
+            else:
+                job = FileOperationJob(target_path, "paste", "Item copied successfully",
+                                       reflink_copy, self.clipboard_source, target_path)
+        elif self.clipboard_action == 'cut':
+            job = FileOperationJob(target_path, "paste", "Item moved successfully",
+                                   shutil.move, self.clipboard_source, target_path)
+            job.kwargs['copy_function'] = job.tracked(shutil.copy2)
+            # Only moves across filesystems copy file by file; a rename
+            # doesn't need the tree counted up front
+            try:
+                same_device = (os.stat(self.clipboard_source).st_dev
+                               == os.stat(current_path).st_dev)
+            except OSError:
+                same_device = False
+            if not same_device:
+                job.count_path = self.clipboard_source
+            # The clipboard is cleared once the move has succeeded
+            self.cut_sources[target_path] = self.clipboard_source
+        else:
+            return
+        self.start_file_job(job, f"Pasting {source_name}...")
+
+    def start_file_job(self, job, progress_label=None):
+        """Run a file operation in the background
+        
+        With a progress label, a cancellable progress dialog is shown
+        if the operation takes longer than a moment.
+        """
+        job.signals.finished.connect(self.file_job_finished)
+        job.signals.failed.connect(self.file_job_failed)
+        job.signals.cancelled.connect(self.file_job_cancelled)
+        if progress_label:
+            dialog = QProgressDialog(progress_label, "Cancel", 0, 0, self)
+            dialog.setWindowTitle("File Operation")
+            dialog.setMinimumDuration(500)
+            dialog.canceled.connect(job.cancel)
+            job.signals.progress.connect(self.file_job_progress)
+            self.file_progress[job.target] = dialog
+        self.file_jobs[job.target] = job
+        self.status_bar.showMessage("Working...")
+        QThreadPool.globalInstance().start(job)
+
+    def end_file_job(self, target):
+        """Forget a background file operation and close its progress dialog"""
+        self.file_jobs.pop(target, None)
+        self.cut_sources.pop(target, None)
+        dialog = self.file_progress.pop(target, None)
+        if dialog:
+            dialog.canceled.disconnect()
+            dialog.close()
+            dialog.deleteLater()
+
+    def file_job_progress(self, target, processed, total):
+        """Show how far a background file operation has got"""
+        dialog = self.file_progress.get(target)
+        if dialog:
+            if total:
+                dialog.setMaximum(total)
+                dialog.setValue(min(processed, total - 1))
+                dialog.setLabelText(f"{processed} of {total} files processed...")
+            else:
+                dialog.setLabelText(f"{processed} files processed...")
+
+    def file_job_finished(self, target, message):
+        """Report a completed background file operation"""
+        source = self.cut_sources.get(target)
+        if source and self.clipboard_action == 'cut' and self.clipboard_source == source:
+            self.clipboard_source = None
+            self.clipboard_action = None
+        self.end_file_job(target)
+        self.status_bar.showMessage(message, 2000)
+
+    def file_job_failed(self, target, error):
+        """Report a failed background file operation"""
+        self.end_file_job(target)
+        self.status_bar.clearMessage()
+        QMessageBox.critical(self, "Error", error)
+
+    def file_job_cancelled(self, target):
+        """Report a cancelled background file operation"""
+        self.end_file_job(target)
+        self.status_bar.showMessage("Operation cancelled; items already processed were kept", 3000)
 
     def delete_selected(self):
         """Delete the selected file or directory"""
@@ -753,18 +1038,15 @@ class FileManager(QMainWindow):
         )
 
         if reply == QMessageBox.Yes:
-            try:
-                if os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-                else:
-                    os.remove(file_path)
-                self.status_bar.showMessage("Item deleted successfully", 2000)
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "Error",
-                    f"Failed to delete: {str(e)}"
-                )
+            if file_path in self.file_jobs:
+                self.status_bar.showMessage("Operation already in progress", 2000)
+                return
+            # Delete on the thread pool so removing large trees doesn't freeze the UI
+            job = FileOperationJob(file_path, "delete", "Item deleted successfully",
+                                   remove_path, file_path)
+            job.kwargs['step'] = job.step
+            job.count_path = file_path
+            self.start_file_job(job, f"Deleting {os.path.basename(file_path)}...")
 
     def rename_item(self, index):
         """Rename a file or directory"""
@@ -797,7 +1079,15 @@ class FileManager(QMainWindow):
 
     def show_properties_dialog(self, file_path):
         """Show the properties dialog"""
-        dialog = PropertiesDialog(file_path, self)
+        try:
+            dialog = PropertiesDialog(file_path, self)
+        except OSError as e:
+            QMessageBox.critical(
+                self,
+                "Error",
+                f"Failed to read properties: {str(e)}"
+            )
+            return
         dialog.exec()
 
     def create_folder(self):
@@ -833,9 +1123,15 @@ class FileManager(QMainWindow):
         if ok and name:
             try:
                 new_file_path = os.path.join(current_path, name)
-                with open(new_file_path, 'w') as f:
-                    pass  # Create empty file
+                # O_EXCL refuses to truncate an existing file
+                os.close(os.open(new_file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
                 self.status_bar.showMessage(f"Created file: {name}", 2000)
+            except FileExistsError:
+                QMessageBox.warning(
+                    self,
+                    "Error",
+                    f"A file named {name} already exists"
+                )
             except Exception as e:
                 QMessageBox.critical(
                     self,
@@ -1,9 +1,59 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTextEdit, QScrollArea
-from PySide6.QtGui import QPixmap, QImage
-from PySide6.QtCore import Qt, QSize
-import magic
-from PIL import Image
-import io
+from PySide6.QtGui import QPixmap, QImage, QImageReader
+from PySide6.QtCore import Qt, QSize, QObject, QRunnable, QThreadPool, QTimer, Signal
+import functools
+import os
+
+# Quiet period after a selection change before the preview is built, so
+# arrowing through a directory only previews where the user stops
+PREVIEW_DELAY_MS = 150
+
+# Types for common extensions, so libmagic is only consulted for the rest
+EXTENSION_TYPES = {
+    '.txt': 'text/plain',
+    '.md': 'text/markdown',
+    '.py': 'text/x-python',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp',
+}
+
+@functools.lru_cache(maxsize=1)
+def get_mime():
+    """libmagic MIME detector, loaded on first use and then shared"""
+    import magic
+    return magic.Magic(mime=True)
+
+class ImageLoadSignals(QObject):
+    """Signals reporting the outcome of an ImageLoadJob"""
+    finished = Signal(int, QImage)  # request id, thumbnail
+    failed = Signal(int, str)  # request id, error message
+
+class ImageLoadJob(QRunnable):
+    """Decodes and thumbnails an image on a QThreadPool"""
+    def __init__(self, request_id, file_path, max_size):
+        super().__init__()
+        self.request_id = request_id
+        self.file_path = file_path
+        self.max_size = max_size
+        self.signals = ImageLoadSignals()
+
+    def run(self):
+        # Decode straight at thumbnail size; JPEGs are scaled while decoding
+        reader = QImageReader(self.file_path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid() and (size.width() > self.max_size.width()
+                               or size.height() > self.max_size.height()):
+            size.scale(self.max_size, Qt.KeepAspectRatio)
+            reader.setScaledSize(size)
+        image = reader.read()
+        if image.isNull():
+            self.signals.failed.emit(self.request_id, reader.errorString())
+        else:
+            self.signals.finished.emit(self.request_id, image)
 
 class PreviewWidget(QWidget):
     """Widget for previewing file contents"""
@@ -34,6 +84,19 @@ class PreviewWidget(QWidget):
         # Initially hide both widgets
         self.image_label.hide()
         self.text_preview.hide()
+        
+        # Reused for every image; the label only holds a shared reference
+        self.preview_pixmap = QPixmap()
+        
+        # Incremented per preview so late image results can be discarded
+        self.request_id = 0
+        
+        # Coalesces rapid selection changes into one preview
+        self.pending_path = None
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(PREVIEW_DELAY_MS)
+        self.preview_timer.timeout.connect(self.show_pending_preview)
 
     def clear_preview(self):
         """Clear current preview"""
@@ -42,6 +105,17 @@ class PreviewWidget(QWidget):
         self.image_label.hide()
         self.text_preview.hide()
 
+    def request_preview(self, file_path):
+        """Preview a file once the selection has settled"""
+        self.pending_path = file_path
+        self.preview_timer.start()
+
+    def show_pending_preview(self):
+        """Preview the last requested file"""
+        if self.pending_path:
+            self.show_preview(self.pending_path)
+            self.pending_path = None
+
     def show_preview(self, file_path):
         """Show preview of the selected file"""
         if not os.path.exists(file_path):
@@ -49,11 +123,12 @@ class PreviewWidget(QWidget):
 
         # Clear previous preview
         self.clear_preview()
+        self.request_id += 1
         
         try:
-            # Detect file type using python-magic
-            mime = magic.Magic(mime=True)
-            file_type = mime.from_file(file_path)
+            # Detect file type from the extension, or with python-magic
+            extension = os.path.splitext(file_path)[1].lower()
+            file_type = EXTENSION_TYPES.get(extension) or get_mime().from_file(file_path)
             
             if file_type.startswith('image/'):
                 self.show_image_preview(file_path)
@@ -69,36 +144,40 @@ class PreviewWidget(QWidget):
             self.text_preview.show()
 
     def show_image_preview(self, file_path):
-        """Show image preview"""
-        try:
-            # Open and resize image if needed
-            with Image.open(file_path) as img:
-                # Calculate resize ratio to fit widget
-                max_size = QSize(400, 300)
-                img.thumbnail((max_size.width(), max_size.height()))
-                
-                # Convert to QPixmap
-                data = io.BytesIO()
-                img.save(data, format=img.format)
-                pixmap = QPixmap()
-                pixmap.loadFromData(data.getvalue())
-                
-                self.image_label.setPixmap(pixmap)
-                self.image_label.show()
-        
-        except Exception as e:
-            self.text_preview.setText(f"Error loading image: {str(e)}")
-            self.text_preview.show()
+        """Show image preview once it has been decoded in the background"""
+        # Calculate resize ratio to fit widget
+        max_size = QSize(400, 300)
+        job = ImageLoadJob(self.request_id, file_path, max_size)
+        job.signals.finished.connect(self.image_loaded)
+        job.signals.failed.connect(self.image_failed)
+        QThreadPool.globalInstance().start(job)
+
+    def image_loaded(self, request_id, image):
+        """Display a decoded thumbnail unless another file was selected since"""
+        if request_id != self.request_id:
+            return
+        self.preview_pixmap.convertFromImage(image)
+        self.image_label.setPixmap(self.preview_pixmap)
+        self.image_label.show()
+
+    def image_failed(self, request_id, error):
+        """Report an image that could not be loaded"""
+        if request_id != self.request_id:
+            return
+        self.text_preview.setText(f"Error loading image: {error}")
+        self.text_preview.show()
 
     def show_text_preview(self, file_path, max_size=4096):
         """Show text file preview"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read(max_size)
-                if len(text) == max_size:
-                    text += "\n... (File truncated)"
-                self.text_preview.setText(text)
-                self.text_preview.show()
+            # One raw read; invalid UTF-8 is replaced instead of failing
+            with open(file_path, 'rb') as f:
+                raw = f.read(max_size + 1)
+            text = raw[:max_size].decode('utf-8', errors='replace')
+            if len(raw) > max_size:
+                text += "\n... (File truncated)"
+            self.text_preview.setPlainText(text)
+            self.text_preview.show()
         except Exception as e:
             self.text_preview.setText(f"Error loading text: {str(e)}")
             self.text_preview.show()
@@ -1,57 +1,154 @@
-from sqlalchemy import create_engine, Column, Integer, String, Table, MetaData
-from sqlalchemy.orm import sessionmaker, declarative_base
+import sqlite3
 import os
+import threading
 
-Base = declarative_base()
+# Paths per DELETE statement, well under SQLite's bound parameter limit
+DELETE_CHUNK = 500
 
-class FileTag(Base):
-    """SQLAlchemy model for file tags"""
-    __tablename__ = 'file_tags'
+def missing_paths(paths):
+    """Return the paths that no longer exist
     
-    id = Column(Integer, primary_key=True)
-    file_path = Column(String, nullable=False)
-    tag = Column(String, nullable=False)
+    Paths are grouped by directory; a directory holding several of them
+    is listed once instead of stat-ing each path.
+    """
+    by_directory = {}
+    for path in paths:
+        directory, name = os.path.split(path)
+        by_directory.setdefault(directory, []).append((path, name))
+    missing = []
+    for directory, entries in by_directory.items():
+        if len(entries) > 1:
+            try:
+                names = set(os.listdir(directory))
+            except OSError:
+                pass  # e.g. search-only permission; stat each path instead
+            else:
+                missing.extend(path for path, name in entries if name not in names)
+                continue
+        for path, _ in entries:
+            try:
+                os.lstat(path)
+            except OSError:
+                missing.append(path)
+    return missing
 
 class TagManager:
-    """Manages file tagging operations using SQLAlchemy"""
+    """Manages file tagging operations in an SQLite database"""
     def __init__(self, db_path='tags.db'):
         """Initialize tag manager with SQLite database"""
-        self.engine = create_engine(f'sqlite:///{db_path}')
-        Base.metadata.create_all(self.engine)
-        Session = sessionmaker(bind=self.engine)
-        self.session = Session()
+        self.db_path = db_path
+        # One connection per thread; WAL lets readers run beside a writer
+        self.local = threading.local()
+        conn = self.connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS file_tags ('
+            'id INTEGER PRIMARY KEY, file_path TEXT NOT NULL, tag TEXT NOT NULL)'
+        )
+        # Lookups go by path, by path and tag, or by tag alone
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS ix_ft_path_tag ON file_tags (file_path, tag)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_ft_tag ON file_tags (tag)')
+        # file path -> tags; every write goes through this instance
+        self.tag_cache = {}
+        self.all_tags = None  # sorted distinct tags, built on first use
+        # Held while filling or invalidating the caches, so a read that
+        # races a write can't store stale tags
+        self.cache_lock = threading.Lock()
+
+    def connection(self):
+        """SQLite connection for the calling thread, opened on first use"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            # Autocommit: every statement is its own transaction
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self.local.conn = conn
+        return conn
 
     def add_tag(self, file_path, tag):
         """Add a tag to a file"""
-        file_tag = FileTag(file_path=file_path, tag=tag)
-        self.session.add(file_tag)
-        self.session.commit()
+        with self.cache_lock:
+            self.connection().execute(
+                'INSERT INTO file_tags (file_path, tag) VALUES (?, ?)', (file_path, tag)
+            )
+            self.tag_cache.pop(file_path, None)
+            self.all_tags = None
+
+    def add_tags(self, pairs):
+        """Add several (file_path, tag) pairs in one transaction"""
+        pairs = list(pairs)
+        conn = self.connection()
+        with self.cache_lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(
+                    'INSERT INTO file_tags (file_path, tag) VALUES (?, ?)', pairs
+                )
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            for file_path, _ in pairs:
+                self.tag_cache.pop(file_path, None)
+            self.all_tags = None
 
     def remove_tag(self, file_path, tag):
         """Remove a tag from a file"""
-        self.session.query(FileTag).filter_by(
-            file_path=file_path, tag=tag
-        ).delete()
-        self.session.commit()
+        with self.cache_lock:
+            self.connection().execute(
+                'DELETE FROM file_tags WHERE file_path = ? AND tag = ?', (file_path, tag)
+            )
+            self.tag_cache.pop(file_path, None)
+            self.all_tags = None
 
     def get_tags(self, file_path):
         """Get all tags for a file"""
-        tags = self.session.query(FileTag.tag).filter_by(
-            file_path=file_path
-        ).all()
-        return [tag[0] for tag in tags]
+        tags = self.tag_cache.get(file_path)
+        if tags is None:
+            with self.cache_lock:
+                rows = self.connection().execute(
+                    'SELECT tag FROM file_tags WHERE file_path = ?', (file_path,)
+                )
+                tags = self.tag_cache[file_path] = [row[0] for row in rows]
+        return list(tags)
+
+    def get_all_tags(self):
+        """Get every tag in use, sorted"""
+        tags = self.all_tags
+        if tags is None:
+            with self.cache_lock:
+                rows = self.connection().execute(
+                    'SELECT DISTINCT tag FROM file_tags ORDER BY tag'
+                )
+                tags = self.all_tags = [row[0] for row in rows]
+        return list(tags)
 
     def get_files_by_tag(self, tag):
         """Get all files with a specific tag"""
-        files = self.session.query(FileTag.file_path).filter_by(
-            tag=tag
-        ).all()
-        return [file[0] for file in files]
+        rows = self.connection().execute(
+            'SELECT file_path FROM file_tags WHERE tag = ?', (tag,)
+        )
+        return [row[0] for row in rows]
 
     def clear_missing_files(self):
         """Remove tags for files that no longer exist"""
-        all_tags = self.session.query(FileTag).all()
-        for tag in all_tags:
-            if not os.path.exists(tag.file_path):
-                self.session.delete(tag)
-        self.session.commit()
+        conn = self.connection()
+        rows = conn.execute('SELECT DISTINCT file_path FROM file_tags').fetchall()
+        missing = missing_paths(row[0] for row in rows)
+        with self.cache_lock:
+            if missing:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    for start in range(0, len(missing), DELETE_CHUNK):
+                        chunk = missing[start:start + DELETE_CHUNK]
+                        placeholders = ', '.join('?' * len(chunk))
+                        conn.execute(
+                            f'DELETE FROM file_tags WHERE file_path IN ({placeholders})', chunk
+                        )
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+                conn.execute('COMMIT')
+            self.tag_cache.clear()
+            self.all_tags = None
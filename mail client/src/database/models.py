@@ -1,8 +1,9 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean, Text, LargeBinary, text, event, Index, select
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import relationship, sessionmaker, deferred
 from datetime import datetime
 from cryptography.fernet import Fernet
+import base64
 import json
 import os
 
@@ -26,6 +27,9 @@ class Account(Base):
 
 class Folder(Base):
     __tablename__ = 'folders'
+    __table_args__ = (
+        Index('ix_folders_account', 'account_id', 'name'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
@@ -38,6 +42,11 @@ class Folder(Base):
 
 class Email(Base):
     __tablename__ = 'emails'
+    __table_args__ = (
+        Index('ix_emails_folder_received', 'folder_id', 'received_date'),
+        Index('ix_emails_account', 'account_id'),
+        Index('ix_emails_message_id', 'message_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     message_id = Column(String, nullable=False)
@@ -57,18 +66,66 @@ class Email(Base):
 
 class Attachment(Base):
     __tablename__ = 'attachments'
+    __table_args__ = (
+        Index('ix_attachments_email', 'email_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     filename = Column(String, nullable=False)
     content_type = Column(String)
     size = Column(Integer)
-    data = Column(Text)  # Base64 encoded data
+    data = deferred(Column(LargeBinary))  # Raw attachment bytes, loaded on access
     email_id = Column(Integer, ForeignKey('emails.id'), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     email = relationship("Email", back_populates="attachments")
 
+class CachedHeader(Base):
+    """Message list headers, valid for as long as the folder's UIDVALIDITY"""
+    __tablename__ = 'cached_headers'
+    
+    account = Column(String, primary_key=True)
+    folder = Column(String, primary_key=True)
+    uid = Column(Integer, primary_key=True)
+    uidvalidity = Column(Integer, nullable=False)
+    subject = Column(String)
+    sender = Column(String)
+    date = Column(String)  # ISO 8601, keeps the sender's UTC offset
+
+# Applied to every new SQLite connection; WAL avoids an fsync per commit
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+def configure_sqlite(engine):
+    """Set the SQLite PRAGMAs on each connection the engine opens"""
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+# Bump when tables, indexes or stored formats change
+SCHEMA_VERSION = 2
+
+def ensure_schema(engine):
+    """Create and migrate the schema unless the database is already current"""
+    with engine.connect() as conn:
+        version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+    if version == SCHEMA_VERSION:
+        return
+    Base.metadata.create_all(engine)
+    create_indexes(engine)
+    migrate_attachment_data(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
 def init_db():
     """Initialize the database"""
     # Create database directory if it doesn't exist
@@ -78,7 +135,37 @@ def init_db():
     # Create database engine
     db_path = os.path.join(db_dir, 'email.db')
     engine = create_engine(f'sqlite:///{db_path}')
+    configure_sqlite(engine)
 
     # Create all tables
-    Base.metadata.create_all(engine)
+    ensure_schema(engine)
     return engine
+
+# Built once; the engine's compiled cache then reuses its SQL on every load
+ACCOUNT_CONFIG_QUERY = select(
+    Account.email,
+    Account.encrypted_credentials,
+    Account.imap_server,
+    Account.smtp_server,
+    Account.use_oauth2,
+    Account.oauth2_refresh_token,
+    Account.updated_at
+)
+
+def create_indexes(engine):
+    """Add indexes missing from tables created by an older schema"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+def migrate_attachment_data(engine):
+    """Convert attachments stored as base64 text to raw bytes"""
+    with engine.begin() as conn:
+        rows = conn.execute(text(
+            "SELECT id, data FROM attachments WHERE typeof(data) = 'text'"
+        )).fetchall()
+        if rows:
+            conn.execute(
+                text("UPDATE attachments SET data = :data WHERE id = :id"),
+                [{'id': row.id, 'data': base64.b64decode(row.data)} for row in rows]
+            )
@@ -1,18 +1,24 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from pathlib import Path
-from .models import Base
+from .models import configure_sqlite, ensure_schema
 
 # Create config directory for secure storage
 config_dir = Path.home() / '.config' / 'hood-mail'
 config_dir.mkdir(parents=True, exist_ok=True)
 
-# Create database engine
+# Create database engine; pooled connections are shared with worker threads
 db_path = config_dir / 'mail.db'
-engine = create_engine(f'sqlite:///{db_path}')
+engine = create_engine(
+    f'sqlite:///{db_path}',
+    pool_size=5,
+    max_overflow=10,
+    connect_args={'check_same_thread': False, 'timeout': 30}
+)
+configure_sqlite(engine)
 
-# Create all tables
-Base.metadata.create_all(engine)
+# Create all tables; skipped once the database is at the current schema version
+ensure_schema(engine)
 
-# Create session factory
-Session = sessionmaker(bind=engine)
+# Create session factory; objects stay usable after commit without a reload
+Session = sessionmaker(bind=engine, expire_on_commit=False)
@@ -3,11 +3,13 @@ from PyQt6.QtWidgets import (
     QLineEdit, QPushButton, QCheckBox, QMessageBox,
     QComboBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
+from sqlalchemy import insert
 
 from database.session import Session
-from database.models import Account
+from database.models import Account, Folder
 from utils.crypto import encrypt_password
+from utils.email_service import DEFAULT_FOLDERS
 
 class AccountDialog(QDialog):
     # Email provider presets
@@ -43,9 +45,11 @@ class AccountDialog(QDialog):
             'use_oauth2': True
         }
     }
+    PROVIDER_NAMES = tuple(EMAIL_PRESETS)
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.update_pending = False
         self.setup_ui()
     
     def setup_ui(self):
@@ -57,7 +61,7 @@ class AccountDialog(QDialog):
         provider_layout = QHBoxLayout()
         provider_label = QLabel("Email Provider:")
         self.provider_combo = QComboBox()
-        self.provider_combo.addItems(self.EMAIL_PRESETS.keys())
+        self.provider_combo.addItems(self.PROVIDER_NAMES)
         self.provider_combo.currentTextChanged.connect(self.provider_changed)
         provider_layout.addWidget(provider_label)
         provider_layout.addWidget(self.provider_combo)
@@ -131,20 +135,44 @@ class AccountDialog(QDialog):
         button_layout.addWidget(cancel_button)
         layout.addLayout(button_layout)
         
-        # Set initial provider
-        self.provider_changed("Custom")
+        # Set initial field states for the Custom provider
+        self.apply_state()
     
     def provider_changed(self, provider):
         """Handle provider selection change"""
         preset = self.EMAIL_PRESETS[provider]
         
-        # Update server fields
-        self.imap_input.setText(preset['imap_server'])
-        self.smtp_input.setText(preset['smtp_server'])
+        # Update server fields, skipping ones that already match
+        if self.imap_input.text() != preset['imap_server']:
+            self.imap_input.setText(preset['imap_server'])
+        if self.smtp_input.text() != preset['smtp_server']:
+            self.smtp_input.setText(preset['smtp_server'])
         
         # Update OAuth2 checkbox
         self.oauth_checkbox.setChecked(preset['use_oauth2'])
         
+        # Clear email field if it doesn't match the provider
+        if provider != "Custom" and not self.email_input.text().endswith(f"@{provider.lower()}.com"):
+            self.email_input.clear()
+        
+        self.schedule_update()
+    
+    def toggle_oauth(self, state):
+        """Toggle password field based on OAuth2 checkbox"""
+        self.schedule_update()
+    
+    def schedule_update(self):
+        """Coalesce field state updates into one pass on the next event loop turn"""
+        if not self.update_pending:
+            self.update_pending = True
+            QTimer.singleShot(0, self.apply_state)
+    
+    def apply_state(self):
+        """Update field states for the current provider and OAuth2 choice"""
+        self.update_pending = False
+        provider = self.provider_combo.currentText()
+        preset = self.EMAIL_PRESETS[provider]
+        
         # Update field states
         is_custom = (provider == "Custom")
         self.imap_input.setEnabled(is_custom)
@@ -153,14 +181,10 @@ class AccountDialog(QDialog):
         # Show/hide OAuth2 help text
         self.oauth_help.setVisible(preset['use_oauth2'])
         
-        # Clear email field if it doesn't match the provider
-        if not is_custom and not self.email_input.text().endswith(f"@{provider.lower()}.com"):
-            self.email_input.clear()
-    
-    def toggle_oauth(self, state):
-        """Toggle password field based on OAuth2 checkbox"""
-        self.password_input.setEnabled(not state)
-        if state:
+        # Toggle password field based on OAuth2 checkbox
+        use_oauth2 = self.oauth_checkbox.isChecked()
+        self.password_input.setEnabled(not use_oauth2)
+        if use_oauth2:
             self.password_input.clear()
             self.password_input.setPlaceholderText("Not needed with OAuth2")
         else:
@@ -185,17 +209,21 @@ class AccountDialog(QDialog):
             if not smtp_server:
                 raise ValueError("SMTP server is required")
             
-            # Create account
-            with Session() as session:
-                account = Account(
-                    email=email,
-                    encrypted_credentials=encrypt_password(password) if password else None,
-                    imap_server=imap_server,
-                    smtp_server=smtp_server,
-                    use_oauth2=use_oauth2
+            # Create account and its default folders in one transaction
+            with Session.begin() as session:
+                account_id = session.execute(
+                    insert(Account).values(
+                        email=email,
+                        encrypted_credentials=encrypt_password(password) if password else None,
+                        imap_server=imap_server,
+                        smtp_server=smtp_server,
+                        use_oauth2=use_oauth2
+                    ).returning(Account.id)
+                ).scalar_one()
+                session.execute(
+                    insert(Folder),
+                    [{'name': name, 'account_id': account_id} for name in DEFAULT_FOLDERS]
                 )
-                session.add(account)
-                session.commit()
             
             self.accept()
         
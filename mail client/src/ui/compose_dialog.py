@@ -5,8 +5,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from database.session import Session
-from database.models import Account
-from utils.email_service import EmailService
+from database.models import ACCOUNT_CONFIG_QUERY
+from utils.email_service_cache import get_service
 
 class ComposeDialog(QDialog):
     def __init__(self, parent=None):
@@ -69,17 +69,11 @@ class ComposeDialog(QDialog):
         """Load email accounts from database"""
         try:
             with Session() as session:
-                accounts = session.query(Account).all()
-                for account in accounts:
-                    config = {
-                        'email': account.email,
-                        'password': account.encrypted_credentials,
-                        'imap_server': account.imap_server,
-                        'smtp_server': account.smtp_server,
-                        'use_oauth2': account.use_oauth2,
-                        'oauth2_refresh_token': account.oauth2_refresh_token
-                    }
-                    self.email_services[account.email] = EmailService(config)
+                # Only the connection settings are needed, so skip building ORM objects
+                rows = session.execute(ACCOUNT_CONFIG_QUERY).all()
+                for row in rows:
+                    config = row._asdict()
+                    self.email_services[row.email] = get_service(config)
         except Exception as e:
             QMessageBox.critical(
                 self,
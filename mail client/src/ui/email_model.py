@@ -0,0 +1,37 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+class EmailListModel(QAbstractTableModel):
+    """Table model over the header dicts returned by EmailService.get_emails"""
+    COLUMNS = (("Subject", 'subject'), ("From", 'sender'), ("Date", 'date'))
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def set_rows(self, rows):
+        """Replace the listed emails with a single model reset"""
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        email = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = email[self.COLUMNS[index.column()][1]]
+            return str(value) if value is not None else ""
+        if role == Qt.ItemDataRole.UserRole:
+            return email['uid']
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section][0]
+        return None
@@ -1,25 +1,50 @@
+import logging
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QTreeView, QTableView, QTextEdit,
     QMenuBar, QMenu, QMessageBox, QSplitter,
     QHeaderView, QLabel, QStatusBar
 )
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QSettings, QThreadPool, QTimer
 from PyQt6.QtGui import QAction, QStandardItemModel, QStandardItem
 from database.session import Session
-from database.models import Account
-from utils.email_service import EmailService
+from database.models import ACCOUNT_CONFIG_QUERY
+from utils.email_service_cache import get_service
 from .account_dialog import AccountDialog
 from .compose_dialog import ComposeDialog
 from .settings_dialog import SettingsDialog
+from .workers import ServiceJob
+from .email_model import EmailListModel
+
+log = logging.getLogger(__name__)
+
+# Threads for server calls; they mostly wait on the network, so this is not tied to the CPU count
+NETWORK_THREADS = 8
+
+# How often idle account connections are pinged so servers keep them open
+KEEPALIVE_INTERVAL_MS = 4 * 60 * 1000
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.email_services = {}
+        self.settings = QSettings('HoodOS', 'MailClient')  # Shared with the settings dialog
+        self.account_items = {}  # email -> folder tree item, kept across refreshes
+        self.current_service = None
+        self.current_folder = None
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(NETWORK_THREADS)
+        self.folder_jobs = {}  # email -> running folder list job
+        self.email_request = None  # key of the folder listing being waited for
+        self.pending_folder = None
+        self.body_request = None  # key of the message body being waited for
         self.setup_ui()
         self.load_accounts()
         
+        self.keepalive_timer = QTimer(self)
+        self.keepalive_timer.timeout.connect(self.keep_connections_alive)
+        self.keepalive_timer.start(KEEPALIVE_INTERVAL_MS)
+        
     def setup_ui(self):
         """Setup the main window UI"""
         self.setWindowTitle("Email Client")
@@ -100,8 +125,7 @@ class MainWindow(QMainWindow):
         
         # Email list
         self.email_list = QTableView()
-        self.email_model = QStandardItemModel()
-        self.email_model.setHorizontalHeaderLabels(["Subject", "From", "Date"])
+        self.email_model = EmailListModel(self)
         self.email_list.setModel(self.email_model)
         self.email_list.clicked.connect(self.email_selected)
         
@@ -132,17 +156,11 @@ class MainWindow(QMainWindow):
         """Load email accounts from database"""
         try:
             with Session() as session:
-                accounts = session.query(Account).all()
-                for account in accounts:
-                    config = {
-                        'email': account.email,
-                        'encrypted_credentials': account.encrypted_credentials,
-                        'imap_server': account.imap_server,
-                        'smtp_server': account.smtp_server,
-                        'use_oauth2': account.use_oauth2,
-                        'oauth2_refresh_token': account.oauth2_refresh_token
-                    }
-                    self.email_services[account.email] = EmailService(config)
+                # Only the connection settings are needed, so skip building ORM objects
+                rows = session.execute(ACCOUNT_CONFIG_QUERY).all()
+                for row in rows:
+                    config = row._asdict()
+                    self.email_services[row.email] = get_service(config)
             self.refresh_folders()
         except Exception as e:
             QMessageBox.critical(
@@ -153,81 +171,133 @@ class MainWindow(QMainWindow):
     
     def refresh_folders(self):
         """Refresh the folder tree"""
-        try:
-            self.folder_model.clear()
-            self.folder_model.setHorizontalHeaderLabels(["Folders"])
-            
-            for email, service in self.email_services.items():
+        # Drop accounts that are gone; the rest keep their items
+        for email in list(self.account_items):
+            if email not in self.email_services:
+                item = self.account_items.pop(email)
+                self.folder_model.removeRow(item.row())
+
+        # Fetch every account's folders on the thread pool, concurrently
+        for email, service in self.email_services.items():
+            if email not in self.account_items:
                 account_item = QStandardItem(email)
                 self.folder_model.appendRow(account_item)
-                
-                try:
-                    folders = service.get_folders()
-                    for folder in folders:
-                        folder_item = QStandardItem(folder)
-                        account_item.appendRow(folder_item)
-                    
-                    self.folder_tree.expand(account_item.index())
-                except Exception as e:
-                    QMessageBox.warning(
-                        self,
-                        "Warning",
-                        f"Could not load folders for {email}: {str(e)}"
-                    )
-            
+                self.account_items[email] = account_item
+
+            if email not in self.folder_jobs:
+                job = ServiceJob(email, service.get_folders)
+                job.signals.finished.connect(self.folders_loaded)
+                job.signals.failed.connect(self.folders_failed)
+                self.folder_jobs[email] = job
+                self.thread_pool.start(job)
+
+        if self.folder_jobs:
+            self.status_bar.showMessage("Refreshing folders...")
+    
+    def folders_loaded(self, email, folders):
+        """Show the folders fetched for an account"""
+        self.folder_jobs.pop(email, None)
+        account_item = self.account_items.get(email)
+        if account_item is not None:
+            self.sync_folder_items(account_item, folders)
+            self.folder_tree.expand(account_item.index())
+        if not self.folder_jobs:
             self.status_bar.showMessage("Folders refreshed")
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Could not refresh folders: {str(e)}"
-            )
+    
+    def folders_failed(self, email, error):
+        """Report an account whose folders could not be fetched"""
+        self.folder_jobs.pop(email, None)
+        log.warning("Could not load folders for %s: %s", email, error)
+        self.status_bar.showMessage(f"Could not load folders for {email}: {error}", 5000)
+    
+    def sync_folder_items(self, account_item, folders):
+        """Update an account's folder rows in place, touching only the ones that changed"""
+        wanted = set(folders)
+        for row in reversed(range(account_item.rowCount())):
+            if account_item.child(row).text() not in wanted:
+                account_item.removeRow(row)
+        
+        # Remaining rows keep their order, so missing folders slot in by position
+        existing = {account_item.child(row).text() for row in range(account_item.rowCount())}
+        for row, folder in enumerate(folders):
+            if folder not in existing:
+                account_item.insertRow(row, QStandardItem(folder))
     
     def folder_selected(self, index):
         """Handle folder selection"""
-        try:
-            item = self.folder_model.itemFromIndex(index)
-            if not item.parent():  # Skip if account is selected
-                return
-                
-            account_email = item.parent().text()
-            folder_name = item.text()
-            
-            service = self.email_services.get(account_email)
-            if service:
-                emails = service.get_emails(folder_name)
-                self.display_emails(emails)
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Could not load emails: {str(e)}"
-            )
+        item = self.folder_model.itemFromIndex(index)
+        if not item.parent():  # Skip if account is selected
+            return
+
+        account_email = item.parent().text()
+        folder_name = item.text()
+
+        service = self.email_services.get(account_email)
+        if service:
+            # Only the most recently selected folder's listing is shown
+            self.email_request = f"{account_email}/{folder_name}"
+            self.pending_folder = (service, folder_name)
+            job = ServiceJob(self.email_request, service.get_emails, folder_name)
+            job.signals.finished.connect(self.emails_loaded)
+            job.signals.failed.connect(self.emails_failed)
+            self.thread_pool.start(job)
+            self.status_bar.showMessage(f"Loading {folder_name}...")
+    
+    def emails_loaded(self, key, emails):
+        """Show a fetched folder listing if it is still the selected one"""
+        if key != self.email_request:
+            return
+        self.current_service, self.current_folder = self.pending_folder
+        self.display_emails(emails)
+        self.status_bar.clearMessage()
+    
+    def emails_failed(self, key, error):
+        """Report a folder listing that could not be fetched"""
+        if key != self.email_request:
+            return
+        log.warning("Could not load emails: %s", error)
+        self.status_bar.showMessage(f"Could not load emails: {error}", 5000)
     
     def display_emails(self, emails):
         """Display emails in the email list"""
-        self.email_model.clear()
-        self.email_model.setHorizontalHeaderLabels(["Subject", "From", "Date"])
-        
-        for email in emails:
-            subject_item = QStandardItem(email['subject'])
-            from_item = QStandardItem(email['sender'])
-            date_item = QStandardItem(str(email['date']))
-            
-            self.email_model.appendRow([subject_item, from_item, date_item])
+        self.email_model.set_rows(emails)
     
     def email_selected(self, index):
         """Handle email selection"""
+        if self.current_service is None:
+            return
         row = index.row()
-        try:
-            email_body = self.email_model.index(row, 0).data()  # Use subject as preview for now
+        # The list only holds headers; download the body on demand
+        uid = self.email_model.index(row, 0).data(Qt.ItemDataRole.UserRole)
+        self.body_request = f"{self.current_folder}/{uid}"
+        job = ServiceJob(self.body_request, self.current_service.get_body,
+                         self.current_folder, uid)
+        job.signals.finished.connect(self.body_loaded)
+        job.signals.failed.connect(self.body_failed)
+        self.thread_pool.start(job)
+    
+    def body_loaded(self, key, email_body):
+        """Show a downloaded message body if it is still the selected message"""
+        if key == self.body_request:
             self.email_preview.setHtml(email_body)
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Could not display email: {str(e)}"
-            )
+    
+    def body_failed(self, key, error):
+        """Report a message body that could not be downloaded"""
+        if key != self.body_request:
+            return
+        log.warning("Could not display email: %s", error)
+        self.status_bar.showMessage(f"Could not display email: {error}", 5000)
+    
+    def keep_connections_alive(self):
+        """Ping every account's open connections in the background"""
+        for email, service in self.email_services.items():
+            job = ServiceJob(email, service.keep_alive)
+            job.signals.failed.connect(self.keep_alive_failed)
+            self.thread_pool.start(job)
+    
+    def keep_alive_failed(self, email, error):
+        """Note an account whose dropped connection could not be restored"""
+        self.status_bar.showMessage(f"Lost connection to {email}: {error}", 5000)
     
     def add_account(self):
         """Show dialog to add new account"""
@@ -242,15 +312,8 @@ class MainWindow(QMainWindow):
     
     def check_mail(self):
         """Check for new mail"""
-        try:
-            self.refresh_folders()
-            self.status_bar.showMessage("Mail check complete")
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Could not check mail: {str(e)}"
-            )
+        # Progress and completion are reported by the folder refresh
+        self.refresh_folders()
     
     def show_settings(self):
         """Show settings dialog"""
@@ -273,6 +336,6 @@ class MainWindow(QMainWindow):
         for service in self.email_services.values():
             try:
                 service.disconnect()
-            except:
-                pass
+            except Exception as e:
+                log.debug("Error disconnecting %s: %s", service.email, e)
         event.accept()
@@ -6,6 +6,7 @@ from PyQt6.QtCore import Qt, QSettings
 
 class SettingsDialog(QDialog):
     """Dialog for managing application settings"""
+    GENERAL_TAB, SECURITY_TAB = range(2)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -13,8 +14,8 @@ class SettingsDialog(QDialog):
         self.setWindowTitle("Settings")
         self.setMinimumWidth(500)
         
-        # Load settings
-        self.settings = QSettings('HoodOS', 'MailClient')
+        # Load settings, reusing the main window's QSettings when there is one
+        self.settings = getattr(parent, 'settings', None) or QSettings('HoodOS', 'MailClient')
         
         self.setup_ui()
         self.load_settings()
@@ -22,11 +23,43 @@ class SettingsDialog(QDialog):
     def setup_ui(self):
         layout = QVBoxLayout()
         
-        # Create tab widget
-        tab_widget = QTabWidget()
+        # Create tab widget; tab contents are built the first time they are shown
+        self.tab_widget = QTabWidget()
+        self.tab_builders = [self.build_general_tab, self.build_security_tab]
+        self.built_tabs = set()
+        self.loaded_values = {}  # key -> value shown when the tab was built
         
-        # General settings tab
-        general_tab = QWidget()
+        self.tab_widget.addTab(QWidget(), "General")
+        self.tab_widget.addTab(QWidget(), "Security")
+        self.tab_widget.currentChanged.connect(self.ensure_tab_built)
+        
+        layout.addWidget(self.tab_widget)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        
+        save_btn = QPushButton("Save")
+        save_btn.clicked.connect(self.save_settings)
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        
+        button_layout.addStretch()
+        button_layout.addWidget(save_btn)
+        button_layout.addWidget(cancel_btn)
+        
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+    
+    def ensure_tab_built(self, index):
+        """Build a tab's widgets and load its settings on first activation"""
+        if index < 0 or index in self.built_tabs:
+            return
+        self.built_tabs.add(index)
+        self.tab_builders[index](self.tab_widget.widget(index))
+    
+    def build_general_tab(self, general_tab):
         general_layout = QVBoxLayout()
         
         # Check interval
@@ -78,8 +111,9 @@ class SettingsDialog(QDialog):
         general_layout.addStretch()
         general_tab.setLayout(general_layout)
         
-        # Security settings tab
-        security_tab = QWidget()
+        self.load_general_settings()
+    
+    def build_security_tab(self, security_tab):
         security_layout = QVBoxLayout()
         
         # Encryption settings
@@ -111,32 +145,14 @@ class SettingsDialog(QDialog):
         security_layout.addStretch()
         security_tab.setLayout(security_layout)
         
-        # Add tabs to widget
-        tab_widget.addTab(general_tab, "General")
-        tab_widget.addTab(security_tab, "Security")
-        
-        layout.addWidget(tab_widget)
-        
-        # Buttons
-        button_layout = QHBoxLayout()
-        
-        save_btn = QPushButton("Save")
-        save_btn.clicked.connect(self.save_settings)
-        
-        cancel_btn = QPushButton("Cancel")
-        cancel_btn.clicked.connect(self.reject)
-        
-        button_layout.addStretch()
-        button_layout.addWidget(save_btn)
-        button_layout.addWidget(cancel_btn)
-        
-        layout.addLayout(button_layout)
-        
-        self.setLayout(layout)
+        self.load_security_settings()
     
     def load_settings(self):
-        """Load settings from QSettings"""
-        # General settings
+        """Load settings from QSettings for the tab shown first"""
+        self.ensure_tab_built(self.tab_widget.currentIndex())
+    
+    def load_general_settings(self):
+        """Load general settings from QSettings"""
         self.check_interval.setValue(self.settings.value('check_interval', 5, int))
         self.check_on_startup.setChecked(self.settings.value('check_on_startup', True, bool))
         
@@ -146,50 +162,68 @@ class SettingsDialog(QDialog):
         self.notify_new_mail.setChecked(self.settings.value('notify_new_mail', True, bool))
         self.notify_sound.setChecked(self.settings.value('notify_sound', True, bool))
         
-        # Security settings
+        self.loaded_values.update(self.general_values())
+    
+    def load_security_settings(self):
+        """Load security settings from QSettings"""
         self.encrypt_storage.setChecked(self.settings.value('encrypt_storage', False, bool))
         self.encrypt_attachments.setChecked(self.settings.value('encrypt_attachments', False, bool))
         
         self.store_passwords.setChecked(self.settings.value('store_passwords', True, bool))
         self.auto_lock.setChecked(self.settings.value('auto_lock', False, bool))
+        
+        self.loaded_values.update(self.security_values())
+    
+    def general_values(self):
+        """Current values of the general settings widgets"""
+        return {
+            'check_interval': self.check_interval.value(),
+            'check_on_startup': self.check_on_startup.isChecked(),
+            'theme': self.theme_combo.currentText(),
+            'font_size': self.font_size.value(),
+            'notify_new_mail': self.notify_new_mail.isChecked(),
+            'notify_sound': self.notify_sound.isChecked()
+        }
+    
+    def security_values(self):
+        """Current values of the security settings widgets"""
+        return {
+            'encrypt_storage': self.encrypt_storage.isChecked(),
+            'encrypt_attachments': self.encrypt_attachments.isChecked(),
+            'store_passwords': self.store_passwords.isChecked(),
+            'auto_lock': self.auto_lock.isChecked()
+        }
     
     def save_settings(self):
         """Save settings to QSettings"""
         try:
-            # General settings
-            self.settings.setValue('check_interval', self.check_interval.value())
-            self.settings.setValue('check_on_startup', self.check_on_startup.isChecked())
-            
-            self.settings.setValue('theme', self.theme_combo.currentText())
-            self.settings.setValue('font_size', self.font_size.value())
-            
-            self.settings.setValue('notify_new_mail', self.notify_new_mail.isChecked())
-            self.settings.setValue('notify_sound', self.notify_sound.isChecked())
-            
-            # Security settings
-            self.settings.setValue('encrypt_storage', self.encrypt_storage.isChecked())
-            self.settings.setValue('encrypt_attachments', self.encrypt_attachments.isChecked())
-            
-            self.settings.setValue('store_passwords', self.store_passwords.isChecked())
-            self.settings.setValue('auto_lock', self.auto_lock.isChecked())
+            # Tabs that were never opened still hold their stored values
+            values = {}
+            if self.GENERAL_TAB in self.built_tabs:
+                values.update(self.general_values())
+            if self.SECURITY_TAB in self.built_tabs:
+                values.update(self.security_values())
             
-            # Sync settings
-            self.settings.sync()
+            # Only write what the user actually changed
+            changed = {key: value for key, value in values.items()
+                       if self.loaded_values.get(key) != value}
+            for key, value in changed.items():
+                self.settings.setValue(key, value)
             
             # Apply settings
-            self.apply_settings()
+            self.apply_settings(changed)
             
             QMessageBox.information(self, "Success", "Settings saved successfully")
             self.accept()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save settings: {str(e)}")
     
-    def apply_settings(self):
-        """Apply settings to application"""
+    def apply_settings(self, changed):
+        """Apply changed settings to application"""
         if self.parent:
             # Update check interval
-            if hasattr(self.parent, 'check_mail_timer'):
-                self.parent.check_mail_timer.setInterval(self.check_interval.value() * 60 * 1000)
+            if hasattr(self.parent, 'check_mail_timer') and 'check_interval' in changed:
+                self.parent.check_mail_timer.setInterval(changed['check_interval'] * 60 * 1000)
             
             # Apply theme
             # TODO: Implement theme switching
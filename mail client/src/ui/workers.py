@@ -0,0 +1,27 @@
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+class ServiceJobSignals(QObject):
+    """Signals reporting the outcome of a ServiceJob"""
+    finished = pyqtSignal(str, object)  # key, result
+    failed = pyqtSignal(str, str)  # key, error message
+
+class ServiceJob(QRunnable):
+    """Runs a blocking EmailService call on a QThreadPool
+    
+    The signals object is created on the calling (GUI) thread, so
+    connected slots run there once the call returns.
+    """
+    def __init__(self, key, call, *args):
+        super().__init__()
+        self.key = key
+        self.call = call
+        self.args = args
+        self.signals = ServiceJobSignals()
+
+    def run(self):
+        try:
+            result = self.call(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.key, str(e))
+        else:
+            self.signals.finished.emit(self.key, result)
@@ -1,8 +1,10 @@
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
 import os
 import base64
+import functools
 from pathlib import Path
 
+@functools.lru_cache(maxsize=1)
 def get_or_create_key():
     """Get existing key or create a new one"""
     key_path = Path.home() / '.config' / 'hood-mail' / 'crypto.key'
@@ -20,15 +22,20 @@ def get_or_create_key():
             f.write(key)
         return key
 
+@functools.lru_cache(maxsize=1)
+def get_fernet():
+    """Get the Fernet instance for the stored key, built once per process"""
+    return Fernet(get_or_create_key())
+
 def encrypt_password(password: str) -> str:
     """Encrypt password using Fernet symmetric encryption"""
     if not password:
         return ''
         
     try:
-        key = get_or_create_key()
-        f = Fernet(key)
-        return base64.b64encode(f.encrypt(password.encode())).decode()
+        f = get_fernet()
+        # Fernet tokens are already URL-safe base64 text
+        return f.encrypt(password.encode()).decode('ascii')
     except Exception as e:
         raise Exception(f"Error encrypting password: {str(e)}")
 
@@ -38,8 +45,11 @@ def decrypt_password(encrypted: str) -> str:
         return ''
         
     try:
-        key = get_or_create_key()
-        f = Fernet(key)
-        return f.decrypt(base64.b64decode(encrypted)).decode()
+        f = get_fernet()
+        try:
+            return f.decrypt(encrypted.encode('ascii')).decode()
+        except InvalidToken:
+            # Stored by older versions with an extra base64 layer
+            return f.decrypt(base64.b64decode(encrypted)).decode()
     except Exception as e:
         raise Exception(f"Error decrypting password: {str(e)}")
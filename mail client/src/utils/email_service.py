@@ -2,11 +2,117 @@ import imaplib
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.header import decode_header
-import email
+from email.parser import BytesParser
+from email.policy import default as default_policy
 import os
-from datetime import datetime
+import re
+import ssl
+import base64
+import quopri
+import itertools
+import functools
+import threading
+import time
 from .crypto import decrypt_password
+from .header_cache import load_headers, store_headers
+
+# Folders every account is expected to have
+DEFAULT_FOLDERS = ('INBOX', 'Sent', 'Drafts', 'Trash', 'Spam')
+
+# Seconds a connection may sit idle before it is probed with NOOP on next use
+NOOP_AFTER_IDLE = 60
+
+# Headers shown in the message list; bodies are fetched when a message is opened
+LIST_FETCH_ITEMS = '(UID BODY.PEEK[HEADER.FIELDS (SUBJECT FROM DATE)])'
+UID_PATTERN = re.compile(rb'UID (\d+)')
+
+# One line of a LIST response: (flags) "delimiter" name
+LIST_RESPONSE = re.compile(rb'\(([^)]*)\) "([^"]*)" "?(.*?)"?\s*$')
+
+# Tokens of a BODYSTRUCTURE response: parentheses, quoted strings and atoms
+BODYSTRUCTURE_TOKEN = re.compile(rb'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()"]+')
+QUOTED_ESCAPE = re.compile(rb'\\(.)')
+
+# Seconds to wait on a server before a connect or command fails
+SOCKET_TIMEOUT = 15
+
+# Shared TLS settings; building a context loads the system CA store
+SSL_CONTEXT = ssl.create_default_context()
+
+# Decodes RFC 2047 headers to str and parses dates while reading the message
+MESSAGE_PARSER = BytesParser(policy=default_policy)
+
+def extract_body(email_message):
+    """Get the HTML part of a message, or its plain text if there is none"""
+    body = ""
+    if email_message.is_multipart():
+        for part in email_message.walk():
+            if part.get_content_type() == "text/html":
+                body = part.get_payload(decode=True).decode()
+                break
+            elif part.get_content_type() == "text/plain":
+                body = part.get_payload(decode=True).decode()
+    else:
+        body = email_message.get_payload(decode=True).decode()
+    return body
+
+def parse_bodystructure(data):
+    """Parse the parenthesized list at the start of data into nested lists of str and None"""
+    stack = [[]]
+    for token in BODYSTRUCTURE_TOKEN.findall(data):
+        if token == b'(':
+            stack.append([])
+        elif token == b')':
+            item = stack.pop()
+            stack[-1].append(item)
+            if len(stack) == 1:
+                return item
+        elif token.startswith(b'"'):
+            stack[-1].append(QUOTED_ESCAPE.sub(rb'\1', token[1:-1]).decode('utf-8', 'replace'))
+        elif token.upper() == b'NIL':
+            stack[-1].append(None)
+        else:
+            stack[-1].append(token.decode('ascii', 'replace'))
+    raise ValueError("Unterminated BODYSTRUCTURE")
+
+def find_text_part(structure, section=''):
+    """Find the section and structure of the HTML part, or else the first plain text part"""
+    if isinstance(structure[0], list):
+        # Multipart: child parts come first, then the subtype and extension data
+        plain = None
+        children = itertools.takewhile(lambda part: isinstance(part, list), structure)
+        for number, child in enumerate(children, 1):
+            found = find_text_part(child, f"{section}.{number}" if section else str(number))
+            if found and found[1][1].lower() == 'html':
+                return found
+            if plain is None:
+                plain = found
+        return plain
+    if structure[0].lower() == 'text' and structure[1].lower() in ('html', 'plain'):
+        return section or '1', structure
+    return None
+
+def decode_part(data, structure):
+    """Undo a body part's transfer encoding and decode it with its charset"""
+    params = structure[2] or []
+    params = {key.lower(): value for key, value in zip(params[::2], params[1::2])}
+    encoding = (structure[5] or '').lower()
+    if encoding == 'base64':
+        data = base64.b64decode(data)
+    elif encoding == 'quoted-printable':
+        data = quopri.decodestring(data)
+    try:
+        return data.decode(params.get('charset') or 'utf-8', 'replace')
+    except LookupError:
+        return data.decode('utf-8', 'replace')
+
+def serialized(method):
+    """Run an EmailService method while holding the service's connection lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class EmailService:
     def __init__(self, config):
@@ -18,6 +124,11 @@ class EmailService:
         self.oauth2_refresh_token = config.get('oauth2_refresh_token')
         self.imap = None
         self.smtp = None
+        self.selected_folder = None
+        self.folders_cache = None  # LIST result, valid for the current connection
+        self.last_used = 0.0
+        # Calls arrive from worker threads; an IMAP connection handles one command at a time
+        self.lock = threading.RLock()
 
     def _get_password(self):
         """Get decrypted password"""
@@ -25,6 +136,7 @@ class EmailService:
             return None  # OAuth2 doesn't use password
         return decrypt_password(self.encrypted_credentials)
 
+    @serialized
     def connect(self):
         """Connect to email servers"""
         try:
@@ -36,15 +148,18 @@ class EmailService:
                     raise Exception("No password available")
 
             # Connect to IMAP
-            self.imap = imaplib.IMAP4_SSL(self.imap_server)
+            self.selected_folder = None
+            self.folders_cache = None
+            self.imap = imaplib.IMAP4_SSL(self.imap_server, ssl_context=SSL_CONTEXT,
+                                          timeout=SOCKET_TIMEOUT)
             if self.use_oauth2:
                 raise NotImplementedError("OAuth2 authentication is not yet implemented")
             else:
                 self.imap.login(self.email, password)
 
             # Connect to SMTP
-            self.smtp = smtplib.SMTP(self.smtp_server)
-            self.smtp.starttls()
+            self.smtp = smtplib.SMTP(self.smtp_server, timeout=SOCKET_TIMEOUT)
+            self.smtp.starttls(context=SSL_CONTEXT)
             if not self.use_oauth2:
                 self.smtp.login(self.email, password)
 
@@ -59,20 +174,57 @@ class EmailService:
                     self.smtp.quit()
                 except:
                     pass
+            self.imap = None
+            self.smtp = None
             raise Exception(f"Connection failed: {str(e)}")
 
+    @serialized
+    def reconnect(self):
+        """Drop the current connections, even if they are already dead, and connect again"""
+        try:
+            self.disconnect()
+        except Exception:
+            pass
+        self.imap = None
+        self.smtp = None
+        self.connect()
+
+    @serialized
+    def ensure_connected(self):
+        """Connect if needed, reusing open connections unless a NOOP shows they were dropped"""
+        if not self.imap or not self.smtp:
+            self.connect()
+        elif time.monotonic() - self.last_used > NOOP_AFTER_IDLE:
+            try:
+                self.imap.noop()
+                self.smtp.noop()
+            except Exception:
+                self.reconnect()
+        self.last_used = time.monotonic()
+
+    @serialized
+    def keep_alive(self):
+        """Send NOOP on open connections so idle servers don't close them"""
+        if self.imap and self.smtp:
+            self.last_used = 0.0
+            self.ensure_connected()
+
+    @serialized
     def disconnect(self):
         """Disconnect from email servers"""
         try:
             if self.imap:
                 self.imap.logout()
                 self.imap = None
+                self.selected_folder = None
+                self.folders_cache = None
             if self.smtp:
                 self.smtp.quit()
                 self.smtp = None
         except Exception as e:
             raise Exception(f"Error disconnecting: {str(e)}")
 
+    @serialized
     def test_connection(self):
         """Test connection to email servers"""
         try:
@@ -82,87 +234,125 @@ class EmailService:
         except:
             return False
 
+    @serialized
     def get_folders(self):
         """Get list of email folders"""
         try:
-            if not self.imap:
-                self.connect()
+            self.ensure_connected()
+            if self.folders_cache is not None:
+                return self.folders_cache
             
-            folders = []
+            folders = set()
             for folder_data in self.imap.list()[1]:
-                folder_name = folder_data.decode().split('"/"')[-1].strip('" ')
-                folders.append(folder_name)
+                # Names sent as literals arrive as tuples and are skipped
+                if not isinstance(folder_data, bytes):
+                    continue
+                match = LIST_RESPONSE.match(folder_data)
+                if match:
+                    folders.add(match.group(3).decode('utf-8', 'replace'))
             
             # Add default folders if not present
-            default_folders = ['INBOX', 'Sent', 'Drafts', 'Trash', 'Spam']
-            for folder in default_folders:
-                if folder not in folders:
-                    folders.append(folder)
+            folders.update(DEFAULT_FOLDERS)
 
-            return sorted(folders)
+            self.folders_cache = sorted(folders)
+            return self.folders_cache
             
         except Exception as e:
             raise Exception(f"Could not retrieve folders: {str(e)}")
 
+    @serialized
     def get_emails(self, folder, limit=50):
-        """Get emails from specified folder"""
+        """Get the headers of the newest emails in the specified folder"""
         try:
-            if not self.imap:
-                self.connect()
+            self.ensure_connected()
 
             self.imap.select(folder)
-            _, messages = self.imap.search(None, 'ALL')
-            email_list = []
+            self.selected_folder = folder
+            uidvalidity = self.imap.response('UIDVALIDITY')[1][0]
+            uidvalidity = int(uidvalidity) if uidvalidity else 0
+            _, messages = self.imap.uid('SEARCH', None, 'ALL')
 
             # Get the last 'limit' messages
-            message_numbers = messages[0].split()
-            start_index = max(0, len(message_numbers) - limit)
+            uids = [int(uid) for uid in messages[0].split()][-limit:]
             
-            for num in message_numbers[start_index:]:
-                _, msg_data = self.imap.fetch(num, '(RFC822)')
-                email_body = msg_data[0][1]
-                email_message = email.message_from_bytes(email_body)
-
-                # Decode subject
-                subject = decode_header(email_message['subject'])[0]
-                subject = subject[0].decode() if isinstance(subject[0], bytes) else subject[0]
-
-                # Get sender
-                sender = decode_header(email_message['from'])[0]
-                sender = sender[0].decode() if isinstance(sender[0], bytes) else sender[0]
-
-                # Get date
-                date_str = email_message['date']
-                date = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %z')
-
-                # Get body
-                body = ""
-                if email_message.is_multipart():
-                    for part in email_message.walk():
-                        if part.get_content_type() == "text/html":
-                            body = part.get_payload(decode=True).decode()
-                            break
-                        elif part.get_content_type() == "text/plain":
-                            body = part.get_payload(decode=True).decode()
-                else:
-                    body = email_message.get_payload(decode=True).decode()
-
-                email_list.append({
-                    'subject': subject,
-                    'sender': sender,
-                    'date': date,
-                    'body': body
-                })
+            # Only messages missing from the header cache go over the wire
+            headers = load_headers(self.email, folder, uidvalidity)
+            missing = [uid for uid in uids if uid not in headers]
+            fetched = []
+            if missing:
+                # Fetch them all in one command instead of one round trip per message
+                uid_set = ','.join(map(str, missing))
+                _, msg_data = self.imap.uid('FETCH', uid_set, LIST_FETCH_ITEMS)
+            else:
+                msg_data = []
+            
+            for response in msg_data:
+                # Message data arrives as (envelope, literal) tuples between b')' lines
+                if not isinstance(response, tuple):
+                    continue
+                uid = UID_PATTERN.search(response[0]).group(1).decode()
+                email_message = MESSAGE_PARSER.parsebytes(response[1], headersonly=True)
+                date_header = email_message['date']
+
+                header = {
+                    'uid': uid,
+                    'subject': email_message['subject'],
+                    'sender': email_message['from'],
+                    'date': date_header.datetime if date_header else None
+                }
+                headers[int(uid)] = header
+                fetched.append(header)
+
+            if fetched or len(headers) != len(uids):
+                store_headers(self.email, folder, uidvalidity, uids, fetched)
 
+            email_list = [headers[uid] for uid in uids if uid in headers]
             return email_list
         except Exception as e:
             raise Exception(f"Could not retrieve emails from {folder}: {str(e)}")
 
+    @serialized
+    def get_body(self, folder, uid):
+        """Download and decode the body of a single email"""
+        try:
+            self.ensure_connected()
+
+            if self.selected_folder != folder:
+                self.imap.select(folder)
+                self.selected_folder = folder
+            
+            # Locate the displayable part so attachments and alternatives stay on the server
+            part = None
+            _, msg_data = self.imap.uid('FETCH', uid, '(BODYSTRUCTURE)')
+            response = msg_data[0]
+            if isinstance(response, bytes) and b'BODYSTRUCTURE ' in response:
+                try:
+                    structure = parse_bodystructure(response[response.index(b'BODYSTRUCTURE ') + 14:])
+                    part = find_text_part(structure)
+                except (ValueError, IndexError, AttributeError):
+                    part = None  # Unusual structure; take the whole message below
+            
+            if part:
+                section, structure = part
+                # PEEK, so opening the preview doesn't set \Seen on the server
+                status, msg_data = self.imap.uid('FETCH', uid, f'(BODY.PEEK[{section}])')
+                if status == 'OK' and msg_data and isinstance(msg_data[0], tuple):
+                    return decode_part(msg_data[0][1], structure)
+                # No section data; fall back to the whole message below
+            
+            status, msg_data = self.imap.uid('FETCH', uid, '(BODY.PEEK[])')
+            if status != 'OK' or not msg_data or not isinstance(msg_data[0], tuple):
+                raise Exception("Message not found")
+            email_message = MESSAGE_PARSER.parsebytes(msg_data[0][1])
+            return extract_body(email_message)
+        except Exception as e:
+            raise Exception(f"Could not retrieve email {uid} from {folder}: {str(e)}")
+
+    @serialized
     def send_email(self, to, subject, body):
         """Send email"""
         try:
-            if not self.smtp:
-                self.connect()
+            self.ensure_connected()
 
             msg = MIMEMultipart()
             msg['From'] = self.email
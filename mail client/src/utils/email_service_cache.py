@@ -0,0 +1,14 @@
+from .email_service import EmailService
+
+# Shared EmailService instances keyed by account email: (updated_at, service)
+_services = {}
+
+def get_service(config):
+    """Return the shared EmailService for an account, rebuilding it when the account changed"""
+    email = config['email']
+    version = config.get('updated_at')
+    cached = _services.get(email)
+    if cached is None or cached[0] != version:
+        cached = (version, EmailService(config))
+        _services[email] = cached
+    return cached[1]
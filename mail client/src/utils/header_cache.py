@@ -0,0 +1,55 @@
+from datetime import datetime
+from sqlalchemy import select, insert, delete
+from database.session import Session
+from database.models import CachedHeader
+
+def load_headers(account, folder, uidvalidity):
+    """Get a folder's cached headers keyed by UID, dropping them if UIDVALIDITY changed"""
+    in_folder = (CachedHeader.account == account, CachedHeader.folder == folder)
+    with Session.begin() as session:
+        rows = session.execute(
+            select(
+                CachedHeader.uid,
+                CachedHeader.uidvalidity,
+                CachedHeader.subject,
+                CachedHeader.sender,
+                CachedHeader.date
+            ).where(*in_folder)
+        ).all()
+        if rows and rows[0].uidvalidity != uidvalidity:
+            # UIDs were reassigned by the server, so none of them can be trusted
+            session.execute(delete(CachedHeader).where(*in_folder))
+            return {}
+    return {
+        row.uid: {
+            'uid': str(row.uid),
+            'subject': row.subject,
+            'sender': row.sender,
+            'date': datetime.fromisoformat(row.date) if row.date else None
+        }
+        for row in rows
+    }
+
+def store_headers(account, folder, uidvalidity, keep_uids, headers):
+    """Drop cached headers outside keep_uids and add the new ones in one transaction"""
+    with Session.begin() as session:
+        session.execute(
+            delete(CachedHeader).where(
+                CachedHeader.account == account,
+                CachedHeader.folder == folder,
+                CachedHeader.uid.not_in(keep_uids)
+            )
+        )
+        if headers:
+            session.execute(insert(CachedHeader), [
+                {
+                    'account': account,
+                    'folder': folder,
+                    'uid': int(header['uid']),
+                    'uidvalidity': uidvalidity,
+                    'subject': header['subject'],
+                    'sender': header['sender'],
+                    'date': header['date'].isoformat() if header['date'] else None
+                }
+                for header in headers
+            ])
@@ -7,66 +7,259 @@ appearance, network, hardware, security, and system preferences.
 import sys
 import os
 import json
-import subprocess
+import re
 import platform
+import functools
+import socket
+import queue
 from pathlib import Path
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QTreeWidget, QTreeWidgetItem, QStackedWidget,
                              QPushButton, QLabel, QGroupBox, QGridLayout, QComboBox,
                              QCheckBox, QSlider, QLineEdit, QSpinBox, QTabWidget,
-                             QListWidget, QListWidgetItem, QMessageBox, QFileDialog,
+                             QListWidget, QMessageBox, QFileDialog,
                              QProgressBar, QTextEdit, QScrollArea, QFrame, QSplitter)
-from PySide6.QtCore import (Qt, QTimer, QThread, pyqtSignal, QSettings, QSize,
-                          QStandardPaths, QProcess)
+from PySide6.QtCore import (Qt, QTimer, QThread, QObject, QRunnable, QThreadPool, Signal,
+                          QSettings, QSize, QStandardPaths, QProcess)
 from PySide6.QtGui import QIcon, QFont, QPalette, QColor, QPixmap, QAction
 
-class SystemInfoWorker(QThread):
-    """Worker thread for gathering system information"""
-    info_ready = pyqtSignal(dict)
+def cpu_model_name():
+    """Processor name from /proc/cpuinfo, falling back to platform.processor()"""
+    try:
+        with open('/proc/cpuinfo', 'rb') as f:
+            for line in f:
+                if line.startswith(b'model name'):
+                    return line.partition(b':')[2].strip().decode('utf-8', 'replace')
+    except OSError:
+        pass
+    return platform.processor()
+
+# Octal escape used for whitespace in /proc/self/mounts
+MOUNT_ESCAPE = re.compile(rb'\\([0-7]{3})')
+
+def human_size(size):
+    """Format a byte count like df -h does"""
+    for unit in ('B', 'K', 'M', 'G', 'T'):
+        if size < 1024 or unit == 'T':
+            return f"{size:.1f}{unit}" if unit != 'B' else f"{size}{unit}"
+        size /= 1024
+
+def disk_usage():
+    """(device, mount point, size, used, available) in bytes per mounted filesystem"""
+    disks = []
+    seen = set()
+    with open('/proc/self/mounts', 'rb') as f:
+        for line in f:
+            device, mount_point = line.split()[:2]
+            mount_point = MOUNT_ESCAPE.sub(lambda m: bytes([int(m.group(1), 8)]),
+                                           mount_point).decode('utf-8', 'replace')
+            if (device, mount_point) in seen:
+                continue
+            seen.add((device, mount_point))
+            try:
+                st = os.statvfs(mount_point)
+            except OSError:
+                continue
+            if not st.f_blocks:
+                continue  # Pseudo filesystems such as proc or sysfs
+            disks.append((device.decode('utf-8', 'replace'), mount_point,
+                          st.f_blocks * st.f_frsize,
+                          (st.f_blocks - st.f_bfree) * st.f_frsize,
+                          st.f_bavail * st.f_frsize))
+    return disks
+
+def disk_usage_table(disks):
+    """Format disk_usage() results in df -h layout"""
+    rows = [("Filesystem", "Size", "Used", "Avail", "Use%", "Mounted on")]
+    for device, mount_point, size, used, avail in disks:
+        percent = used * 100 // (used + avail) if used + avail else 0
+        rows.append((device, human_size(size), human_size(used),
+                     human_size(avail), f"{percent}%", mount_point))
+    widths = [max(len(row[col]) for row in rows) for col in range(5)]
+    return '\n'.join(' '.join(cell.ljust(width) for cell, width in zip(row, widths)) + ' ' + row[5]
+                     for row in rows)
+
+def network_interfaces():
+    """Names of the network interfaces, without loopback"""
+    return [name for _, name in socket.if_nameindex() if not name.startswith('lo')]
+
+@functools.lru_cache(maxsize=1)
+def static_system_info():
+    """System details that cannot change while the program runs"""
+    uname = platform.uname()
+    return {
+        'os': uname.system,
+        'os_version': uname.version,
+        'architecture': uname.machine,
+        'processor': cpu_model_name() if sys.platform.startswith('linux') else platform.processor(),
+        'hostname': uname.node,
+        'python_version': platform.python_version()
+    }
+
+class SettingsWriter(QThread):
+    """Writes queued settings to disk so the GUI never waits on it
     
+    Everything queued while a write is in progress goes out together,
+    with one sync per settings file. None stops the thread once the
+    queue ahead of it has been written.
+    """
+    def __init__(self):
+        super().__init__()
+        self.queue = queue.Queue()
+
     def run(self):
-        """Collect system information"""
-        info = {
-            'os': platform.system(),
-            'os_version': platform.version(),
-            'architecture': platform.machine(),
-            'processor': platform.processor(),
-            'hostname': platform.node(),
-            'python_version': platform.python_version(),
-            'memory': self.get_memory_info(),
-            'disk': self.get_disk_info(),
-            'network': self.get_network_info()
-        }
-        self.info_ready.emit(info)
+        settings = {}  # QSettings are created on this thread
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            touched = set()
+            for item in batch:
+                if item is None:
+                    continue
+                name, key, value = item
+                if name not in settings:
+                    settings[name] = QSettings("HoodOS", name)
+                settings[name].setValue(key, value)
+                touched.add(name)
+            for name in touched:
+                settings[name].sync()
+            if None in batch:
+                return
+
+class SettingsCache:
+    """Process-wide cache of settings values, one QSettings per settings file
+    
+    Each key is read from QSettings once; set() only queues values that
+    differ from what was read or last written, for the SettingsWriter.
+    """
+    settings = {}  # settings file -> QSettings
+    values = {}  # settings file -> {key: value}
+    writer = None  # started on the first write
+
+    @classmethod
+    def open(cls, name):
+        """QSettings and cached values for a settings file"""
+        if name not in cls.settings:
+            cls.settings[name] = QSettings("HoodOS", name)
+            cls.values[name] = {}
+        return cls.settings[name], cls.values[name]
+
+    @classmethod
+    def get(cls, name, key, default=None, type=None):
+        """Get a setting, reading it from disk only the first time"""
+        settings, values = cls.open(name)
+        if key not in values:
+            if type is None:
+                values[key] = settings.value(key, default)
+            else:
+                values[key] = settings.value(key, default, type=type)
+        return values[key]
+
+    @classmethod
+    def set(cls, name, key, value):
+        """Store a setting if it changed; the write happens in the background"""
+        settings, values = cls.open(name)
+        if key in values and values[key] == value:
+            return
+        values[key] = value
+        if cls.writer is None:
+            cls.writer = SettingsWriter()
+            cls.writer.start()
+        cls.writer.queue.put((name, key, value))
+
+    @classmethod
+    def flush(cls):
+        """Wait until every queued setting is on disk"""
+        if cls.writer is not None:
+            cls.writer.queue.put(None)
+            cls.writer.wait()
+            cls.writer = None
+
+def parse_meminfo(meminfo):
+    """Total and available memory in bytes from /proc/meminfo contents"""
+    total = available = None
+    for line in meminfo.splitlines():
+        if line.startswith(b'MemTotal:'):
+            total = int(line.split()[1]) * 1024
+        elif line.startswith(b'MemAvailable:'):
+            available = int(line.split()[1]) * 1024
+        if total is not None and available is not None:
+            return {'total': total, 'available': available}
+    return {'total': 0, 'available': 0}
+
+# Milliseconds between memory samples taken by SystemStatsMonitor
+MEMORY_SAMPLE_INTERVAL_MS = 10000
+
+class SystemStatsMonitor(QObject):
+    """Samples memory usage on a timer for every widget that shows it
     
-    def get_memory_info(self):
-        """Get memory information"""
+    /proc/meminfo stays open and is re-read with pread, so a sample is a
+    single syscall. Use instance() to get the shared monitor.
+    """
+    memory_changed = Signal(dict)
+    shared = None
+
+    @classmethod
+    def instance(cls):
+        """The process-wide monitor, started on first use"""
+        if cls.shared is None:
+            cls.shared = cls()
+        return cls.shared
+
+    def __init__(self):
+        super().__init__()
         try:
-            if platform.system() == "Linux":
-                with open('/proc/meminfo', 'r') as f:
-                    meminfo = f.read()
-                total = int([line for line in meminfo.split('\n') if 'MemTotal' in line][0].split()[1]) * 1024
-                available = int([line for line in meminfo.split('\n') if 'MemAvailable' in line][0].split()[1]) * 1024
-                return {'total': total, 'available': available}
-        except:
-            pass
-        return {'total': 0, 'available': 0}
+            self.fd = os.open('/proc/meminfo', os.O_RDONLY)
+        except OSError:
+            self.fd = None  # Not Linux; memory stays unavailable
+        self.memory = {'total': 0, 'available': 0}
+        self.sample()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.sample)
+        self.timer.start(MEMORY_SAMPLE_INTERVAL_MS)
+
+    def sample(self):
+        """Read current memory usage and notify listeners"""
+        if self.fd is not None:
+            try:
+                self.memory = parse_meminfo(os.pread(self.fd, 4096, 0))
+            except (OSError, ValueError):
+                pass
+        self.memory_changed.emit(self.memory)
+
+class SystemInfoSignals(QObject):
+    """Signals reporting the result of a SystemInfoWorker"""
+    info_ready = Signal(dict)
+
+class SystemInfoWorker(QRunnable):
+    """Gathers system information on a QThreadPool
+    
+    The signals object is created on the calling (GUI) thread, so
+    connected slots run there.
+    """
+    def __init__(self):
+        super().__init__()
+        self.signals = SystemInfoSignals()
+    
+    def run(self):
+        """Collect system information"""
+        info = dict(static_system_info())
+        info['disk'] = self.get_disk_info()
+        self.signals.info_ready.emit(info)
     
     def get_disk_info(self):
         """Get disk usage information"""
         try:
-            result = subprocess.run(['df', '-h'], capture_output=True, text=True)
-            return result.stdout
-        except:
-            return "Disk information unavailable"
-    
-    def get_network_info(self):
-        """Get network interface information"""
-        try:
-            result = subprocess.run(['ip', 'addr'], capture_output=True, text=True)
-            return result.stdout
+            return disk_usage()
         except:
-            return "Network information unavailable"
+            return []
+
+# Name filter offered when choosing a wallpaper
+WALLPAPER_FILTER = "Image Files (*.png *.jpg *.jpeg *.bmp)"
 
 class AppearanceSettings(QWidget):
     """Appearance and theme settings"""
@@ -154,27 +347,27 @@ class AppearanceSettings(QWidget):
     
     def choose_wallpaper(self):
         """Choose wallpaper image"""
+        last_dir = SettingsCache.get("SystemSettings", "last_wallpaper_dir", str(Path.home()))
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Choose Wallpaper", "", "Image Files (*.png *.jpg *.jpeg *.bmp)"
+            self, "Choose Wallpaper", last_dir, WALLPAPER_FILTER
         )
         if file_path:
             self.wallpaper_btn.setText(f"Wallpaper: {Path(file_path).name}")
+            SettingsCache.set("SystemSettings", "last_wallpaper_dir", str(Path(file_path).parent))
     
     def load_settings(self):
         """Load current settings"""
-        settings = QSettings("HoodOS", "SystemSettings")
-        self.theme_combo.setCurrentText(settings.value("theme", "Light"))
-        self.font_combo.setCurrentText(settings.value("font", "Default"))
-        self.font_size_spin.setValue(int(settings.value("font_size", 12)))
-        self.icon_size_slider.setValue(int(settings.value("icon_size", 48)))
+        self.theme_combo.setCurrentText(SettingsCache.get("SystemSettings", "theme", "Light"))
+        self.font_combo.setCurrentText(SettingsCache.get("SystemSettings", "font", "Default"))
+        self.font_size_spin.setValue(SettingsCache.get("SystemSettings", "font_size", 12, int))
+        self.icon_size_slider.setValue(SettingsCache.get("SystemSettings", "icon_size", 48, int))
     
     def apply_settings(self):
         """Apply appearance settings"""
-        settings = QSettings("HoodOS", "SystemSettings")
-        settings.setValue("theme", self.theme_combo.currentText())
-        settings.setValue("font", self.font_combo.currentText())
-        settings.setValue("font_size", self.font_size_spin.value())
-        settings.setValue("icon_size", self.icon_size_slider.value())
+        SettingsCache.set("SystemSettings", "theme", self.theme_combo.currentText())
+        SettingsCache.set("SystemSettings", "font", self.font_combo.currentText())
+        SettingsCache.set("SystemSettings", "font_size", self.font_size_spin.value())
+        SettingsCache.set("SystemSettings", "icon_size", self.icon_size_slider.value())
         
         QMessageBox.information(self, "Settings Applied", 
                               "Appearance settings have been applied. Restart applications to see changes.")
@@ -243,17 +436,7 @@ class NetworkSettings(QWidget):
     def load_network_info(self):
         """Load network interface information"""
         try:
-            result = subprocess.run(['ip', 'link', 'show'], capture_output=True, text=True)
-            interfaces = []
-            for line in result.stdout.split('\n'):
-                if ': ' in line and not line.startswith(' '):
-                    interface = line.split(':')[1].strip()
-                    if not interface.startswith('lo'):
-                        interfaces.append(interface)
-            
-            for interface in interfaces:
-                item = QListWidgetItem(interface)
-                self.interfaces_list.addItem(item)
+            self.interfaces_list.addItems(network_interfaces())
         except:
             self.interfaces_list.addItem("Network information unavailable")
     
@@ -268,6 +451,12 @@ class SystemInfoWidget(QWidget):
         super().__init__(parent)
         self.parent = parent
         self.init_ui()
+        
+        # Memory comes from the shared monitor instead of each refresh
+        monitor = SystemStatsMonitor.instance()
+        monitor.memory_changed.connect(self.show_memory)
+        self.show_memory(monitor.memory)
+        
         self.load_system_info()
     
     def init_ui(self):
@@ -337,9 +526,18 @@ class SystemInfoWidget(QWidget):
         self.refresh_btn.setEnabled(False)
         self.refresh_btn.setText("Loading...")
         
-        self.worker = SystemInfoWorker()
-        self.worker.info_ready.connect(self.update_system_info)
-        self.worker.start()
+        worker = SystemInfoWorker()
+        worker.signals.info_ready.connect(self.update_system_info)
+        QThreadPool.globalInstance().start(worker)
+    
+    def show_memory(self, memory):
+        """Show the latest memory sample"""
+        if memory['total'] > 0:
+            total_gb = memory['total'] / (1024**3)
+            available_gb = memory['available'] / (1024**3)
+            self.memory_value.setText(f"{available_gb:.1f} GB / {total_gb:.1f} GB")
+        else:
+            self.memory_value.setText("Unavailable")
     
     def update_system_info(self, info):
         """Update the system information display"""
@@ -348,16 +546,11 @@ class SystemInfoWidget(QWidget):
         self.hostname_value.setText(info['hostname'])
         self.processor_value.setText(info['processor'])
         
-        # Format memory info
-        if info['memory']['total'] > 0:
-            total_gb = info['memory']['total'] / (1024**3)
-            available_gb = info['memory']['available'] / (1024**3)
-            self.memory_value.setText(f"{available_gb:.1f} GB / {total_gb:.1f} GB")
-        else:
-            self.memory_value.setText("Unavailable")
-        
         # Display disk info
-        self.disk_text.setText(info['disk'])
+        if info['disk']:
+            self.disk_text.setPlainText(disk_usage_table(info['disk']))
+        else:
+            self.disk_text.setPlainText("Disk information unavailable")
         
         self.refresh_btn.setEnabled(True)
         self.refresh_btn.setText("Refresh Information")
@@ -435,32 +628,38 @@ class SecuritySettings(QWidget):
         """Load current security settings"""
         # Load user accounts
         try:
-            result = subprocess.run(['cut', '-d:', '-f1', '/etc/passwd'], 
-                                  capture_output=True, text=True)
-            users = [user.strip() for user in result.stdout.split('\n') if user.strip()]
-            for user in users[:10]:  # Show first 10 users
-                self.users_list.addItem(user)
+            # Local accounts only; enumerating remote name services can stall
+            users = []
+            with open('/etc/passwd', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    name = line.partition(':')[0].strip()
+                    if name and not name.startswith(('#', '+', '-')):
+                        users.append(name)
+                        if len(users) >= 10:  # Show first 10 users
+                            break
+            self.users_list.addItems(users)
         except:
             self.users_list.addItem("User information unavailable")
         
         # Load privacy settings
-        settings = QSettings("HoodOS", "SecuritySettings")
-        self.telemetry_enabled.setChecked(settings.value("telemetry", False, type=bool))
-        self.crash_reports.setChecked(settings.value("crash_reports", False, type=bool))
-        self.usage_stats.setChecked(settings.value("usage_stats", False, type=bool))
-        self.auto_updates.setChecked(settings.value("auto_updates", True, type=bool))
+        self.telemetry_enabled.setChecked(SettingsCache.get("SecuritySettings", "telemetry", False, bool))
+        self.crash_reports.setChecked(SettingsCache.get("SecuritySettings", "crash_reports", False, bool))
+        self.usage_stats.setChecked(SettingsCache.get("SecuritySettings", "usage_stats", False, bool))
+        self.auto_updates.setChecked(SettingsCache.get("SecuritySettings", "auto_updates", True, bool))
     
     def apply_security_settings(self):
         """Apply security settings"""
-        settings = QSettings("HoodOS", "SecuritySettings")
-        settings.setValue("telemetry", self.telemetry_enabled.isChecked())
-        settings.setValue("crash_reports", self.crash_reports.isChecked())
-        settings.setValue("usage_stats", self.usage_stats.isChecked())
-        settings.setValue("auto_updates", self.auto_updates.isChecked())
+        SettingsCache.set("SecuritySettings", "telemetry", self.telemetry_enabled.isChecked())
+        SettingsCache.set("SecuritySettings", "crash_reports", self.crash_reports.isChecked())
+        SettingsCache.set("SecuritySettings", "usage_stats", self.usage_stats.isChecked())
+        SettingsCache.set("SecuritySettings", "auto_updates", self.auto_updates.isChecked())
         
         QMessageBox.information(self, "Security Settings", 
                               "Security settings have been applied.")
 
+# How often a moved or resized window's geometry is saved while it is open
+GEOMETRY_SAVE_INTERVAL_MS = 30000
+
 class SystemSettingsMainWindow(QMainWindow):
     """Main window for Hood OS System Settings"""
     def __init__(self):
@@ -471,6 +670,12 @@ class SystemSettingsMainWindow(QMainWindow):
         
         self.init_ui()
         self.load_settings()
+        
+        # Geometry is only written after the user moved or resized the window
+        self.geometry_dirty = False
+        self.geometry_timer = QTimer(self)
+        self.geometry_timer.timeout.connect(self.save_geometry)
+        self.geometry_timer.start(GEOMETRY_SAVE_INTERVAL_MS)
     
     def init_ui(self):
         """Initialize the main UI"""
@@ -496,26 +701,26 @@ class SystemSettingsMainWindow(QMainWindow):
             ("System Info", "System information")
         ]
         
+        items = []
         for category, description in categories:
             item = QTreeWidgetItem([category])
             item.setToolTip(0, description)
-            self.sidebar.addTopLevelItem(item)
+            items.append(item)
+        self.sidebar.addTopLevelItems(items)
         
         self.sidebar.itemClicked.connect(self.on_category_selected)
         
         # Content area
         self.content_stack = QStackedWidget()
         
-        # Add settings widgets
-        self.appearance_widget = AppearanceSettings(self)
-        self.network_widget = NetworkSettings(self)
-        self.security_widget = SecuritySettings(self)
-        self.system_info_widget = SystemInfoWidget(self)
-        
-        self.content_stack.addWidget(self.appearance_widget)
-        self.content_stack.addWidget(self.network_widget)
-        self.content_stack.addWidget(self.security_widget)
-        self.content_stack.addWidget(self.system_info_widget)
+        # Settings pages are built the first time their category is opened
+        self.page_factories = {
+            "Appearance": AppearanceSettings,
+            "Network": NetworkSettings,
+            "Security": SecuritySettings,
+            "System Info": SystemInfoWidget
+        }
+        self.pages = {}
         
         # Add to splitter
         splitter.addWidget(self.sidebar)
@@ -530,33 +735,51 @@ class SystemSettingsMainWindow(QMainWindow):
         
         # Select first category by default
         self.sidebar.setCurrentItem(self.sidebar.topLevelItem(0))
-        self.content_stack.setCurrentIndex(0)
+        self.show_page("Appearance")
     
     def on_category_selected(self, item, column):
         """Handle category selection"""
         category = item.text(0)
-        category_map = {
-            "Appearance": 0,
-            "Network": 1,
-            "Security": 2,
-            "System Info": 3
-        }
-        
-        if category in category_map:
-            self.content_stack.setCurrentIndex(category_map[category])
+        if category in self.page_factories:
+            self.show_page(category)
             self.status_bar.showMessage(f"Selected: {category}")
     
+    def show_page(self, category):
+        """Show the settings page for a category, building it on first use"""
+        page = self.pages.get(category)
+        if page is None:
+            page = self.page_factories[category](self)
+            self.content_stack.addWidget(page)
+            self.pages[category] = page
+        self.content_stack.setCurrentWidget(page)
+    
     def load_settings(self):
         """Load application settings"""
-        settings = QSettings("HoodOS", "SystemSettings")
-        geometry = settings.value("geometry")
+        geometry = SettingsCache.get("SystemSettings", "geometry")
         if geometry:
             self.restoreGeometry(geometry)
     
+    def resizeEvent(self, event):
+        """Remember that the geometry needs saving"""
+        self.geometry_dirty = True
+        super().resizeEvent(event)
+    
+    def moveEvent(self, event):
+        """Remember that the geometry needs saving"""
+        self.geometry_dirty = True
+        super().moveEvent(event)
+    
+    def save_geometry(self):
+        """Save the window geometry if it changed since the last save"""
+        if self.geometry_dirty:
+            self.geometry_dirty = False
+            SettingsCache.set("SystemSettings", "geometry", self.saveGeometry())
+    
     def closeEvent(self, event):
         """Save settings on close"""
-        settings = QSettings("HoodOS", "SystemSettings")
-        settings.setValue("geometry", self.saveGeometry())
+        self.geometry_timer.stop()
+        self.save_geometry()
+        SettingsCache.flush()
         event.accept()
 
 def main():